@@ -0,0 +1 @@
+# Headless frame-time benchmarks; run `python benchmarks/run.py` from the python/ folder.
@@ -0,0 +1,255 @@
+"""Headless frame-time benchmarks for the pygame games.
+
+Usage: python benchmarks/run.py [--games tetris,space_invaders] [--frames 600]
+
+Each game runs in its own process with SDL's dummy video/audio drivers and a
+scripted key sequence. Update and render are timed separately; passing runs
+are appended to history.json, and the exit code is 1 when a game's p95 frame
+time regresses past the limits in thresholds.json.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GAMES_DIR = os.path.dirname(BENCH_DIR)
+HISTORY_PATH = os.path.join(BENCH_DIR, "history.json")
+THRESHOLDS_PATH = os.path.join(BENCH_DIR, "thresholds.json")
+DEFAULT_FRAMES = 600
+FPS = 60
+
+# Scripted input per game: (key name, period, hold, offset). The key goes down
+# on every frame where (frame - offset) % period == 0 and up `hold` frames later.
+# Memory Card is a tkinter app and can't run under SDL's dummy driver.
+SCRIPTS = {
+    "tetris": [
+        ("K_SPACE", 30, 1, 0),   # Start, then hard drop
+        ("K_LEFT", 60, 20, 2),   # Held past DAS so auto-repeat runs
+        ("K_RIGHT", 60, 20, 32),
+        ("K_UP", 13, 1, 3),
+        ("K_r", 120, 1, 60),     # Restart once the board tops out
+    ],
+    "space_invaders": [
+        ("K_SPACE", 8, 1, 0),
+        ("K_LEFT", 90, 40, 0),
+        ("K_RIGHT", 90, 40, 45),
+    ],
+    "infinite_runner": [
+        ("K_SPACE", 40, 1, 10),
+        ("K_DOWN", 150, 30, 100),
+        ("K_r", 60, 1, 30),
+    ],
+    "top_down_racer": [
+        ("K_LEFT", 80, 20, 0),
+        ("K_RIGHT", 80, 20, 40),
+        ("K_UP", 200, 30, 10),
+        ("K_SPACE", 90, 1, 45),
+    ],
+}
+
+
+def scripted_events(script, frame):
+    import pygame
+    events = []
+    for key_name, period, hold, offset in script:
+        key = getattr(pygame, key_name)
+        if (frame - offset) % period == 0:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+        if (frame - offset - hold) % period == 0 and frame - offset >= hold:
+            events.append(pygame.event.Event(pygame.KEYUP, key=key))
+    return events
+
+
+def load_game(name):
+    """Import a game module and return (step_update, step_render) callables."""
+    import pygame
+    sys.path.insert(0, os.path.join(GAMES_DIR, name))
+    game = __import__(name)
+    game.init()
+
+    if name == "tetris":
+        def update(frame):
+            now = time.perf_counter()
+            for event in pygame.event.get():
+                game.handle_event(event, now)
+            game.update_game(now)
+
+        def render():
+            game.draw_game()
+            pygame.display.flip()
+        return update, render
+
+    if name == "space_invaders":
+        game.setup(seed=0)
+        game.game_state = "playing"
+
+        def update(frame):
+            game.inputs.poll(frame * 1000 // FPS)
+            if game.game_state != "playing":
+                game.setup(seed=0)
+                game.game_state = "playing"
+            game.update_playing(game.read_controls())
+
+        def render():
+            game.frame.fill(game.BLACK)
+            game.draw_playing()
+            game.present()
+            pygame.display.flip()
+        return update, render
+
+    if name == "infinite_runner":
+        game.setup(seed=0)
+
+        def update(frame):
+            game.inputs.poll(frame * 1000 // FPS)
+            game.update_game()
+
+        def render():
+            game.draw_game()
+            pygame.display.flip()
+        return update, render
+
+    if name == "top_down_racer":
+        game.setup()
+
+        def update(frame):
+            game.inputs.poll(frame * 1000 // FPS)
+            game.update_game(1 / FPS)  # Simulate real-time frames, not the benchmark's pace
+        return update, game.draw
+
+    raise ValueError(f"no benchmark adapter for {name}")
+
+
+def run_worker(name, frames):
+    """Run one game in this process and print its raw timings as JSON."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    random.seed(0)
+    update, render = load_game(name)
+    import pygame
+    script = SCRIPTS[name]
+    update_ms, render_ms = [], []
+    for frame in range(frames):
+        for event in scripted_events(script, frame):
+            pygame.event.post(event)
+        start = time.perf_counter()
+        update(frame)
+        middle = time.perf_counter()
+        render()
+        end = time.perf_counter()
+        update_ms.append((middle - start) * 1000)
+        render_ms.append((end - middle) * 1000)
+    pygame.quit()
+    json.dump({"update": update_ms, "render": render_ms}, sys.stdout)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def bench_game(name, frames):
+    """Run a game in a fresh process; each game owns the display at import."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", name, "--frames", str(frames)],
+        capture_output=True, text=True, cwd=os.path.join(GAMES_DIR, name),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{name} benchmark failed:\n{result.stderr}")
+    raw = json.loads(result.stdout.strip().splitlines()[-1])
+    frame_ms = [u + r for u, r in zip(raw["update"], raw["render"])]
+    return {
+        "update": summarize(raw["update"]),
+        "render": summarize(raw["render"]),
+        "frame": summarize(frame_ms),
+    }
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCH_DIR)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def check_regressions(results, history, thresholds):
+    """Compare each game's p95 frame time against its budget and recent runs."""
+    failures = []
+    window = thresholds.get("window", 5)
+    max_regression = thresholds.get("max_regression", 0.25)
+    for name, result in results.items():
+        p95 = result["frame"]["p95"]
+        budget = thresholds.get("games", {}).get(name, {}).get("p95_ms")
+        if budget is not None and p95 > budget:
+            failures.append(f"{name}: p95 {p95:.2f} ms exceeds budget {budget:.2f} ms")
+        previous = [run["results"][name]["frame"]["p95"] for run in history if name in run["results"]][-window:]
+        if previous:
+            baseline = statistics.median(previous)
+            if p95 > baseline * (1 + max_regression):
+                failures.append(f"{name}: p95 {p95:.2f} ms is more than {max_regression:.0%} over baseline {baseline:.2f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", default=",".join(SCRIPTS), help="comma-separated game names")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--no-record", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.frames)
+        return 0
+
+    results = {}
+    for name in args.games.split(","):
+        results[name] = bench_game(name, args.frames)
+        r = results[name]
+        print(f"{name:16} update p50 {r['update']['p50']:7.3f}  p95 {r['update']['p95']:7.3f} | "
+              f"render p50 {r['render']['p50']:7.3f}  p95 {r['render']['p95']:7.3f} | "
+              f"frame p95 {r['frame']['p95']:7.3f}  max {r['frame']['max']:7.3f} ms")
+
+    history = load_json(HISTORY_PATH, [])
+    failures = check_regressions(results, history, load_json(THRESHOLDS_PATH, {}))
+    for failure in failures:
+        print("REGRESSION", failure)
+
+    # Only passing runs become part of the baseline, so a regression can't
+    # slowly raise the bar for the runs after it
+    if not failures and not args.no_record:
+        history.append({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "frames": args.frames,
+            "results": results,
+        })
+        with open(HISTORY_PATH, "w") as f:
+            json.dump(history, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
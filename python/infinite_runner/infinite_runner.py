@@ -3,14 +3,18 @@ import random
 import math
 import asyncio
 import platform
+import os
+import sys
+import numpy as np
 
-# Initialize Pygame
-pygame.init()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.text_cache import TextCache
+from shared.input_buffer import InputBuffer
+from shared.profiler import FrameProfiler
 
-# Set up the display
+# Display size; importing the module opens nothing, init() does
 WIDTH, HEIGHT = 800, 400
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Infinite Runner")
+screen = None
 
 # Colors
 WHITE = (255, 255, 255)
@@ -23,9 +27,22 @@ GROUND_HEIGHT = HEIGHT - 50
 FPS = 60
 INITIAL_SPEED = 5
 SPEED_INCREMENT = 0.01
+DEBUG = os.environ.get("RUNNER_DEBUG") == "1"  # Show per-frame allocation metric
+LEVEL_SEED = os.environ.get("RUNNER_SEED")  # Fixed seed makes runs reproducible
+JUMP_BUFFER_MS = 120  # A jump pressed this long before landing still fires
+
+# All input is drained once per frame in main()
+inputs = InputBuffer()
+profiler = FrameProfiler("infinite_runner")  # F3 overlay, F9 cProfile capture
+
+# Fonts are loaded once; rendered text is memoized
+text_cache = TextCache()
 
 # Player class
 class Player:
+    __slots__ = ("width", "height", "x", "y", "jump_velocity", "velocity_y", "gravity",
+                 "is_jumping", "is_sliding", "rect")
+
     def __init__(self):
         self.width = 40
         self.height = 60
@@ -38,9 +55,13 @@ class Player:
         self.is_sliding = False
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
 
+    def can_jump(self):
+        # Only from the ground (jumping is the only way off it) and not while sliding
+        return not self.is_jumping and not self.is_sliding
+
     def jump(self):
         # Start jumping if not already jumping or sliding
-        if not self.is_jumping and not self.is_sliding:
+        if self.can_jump():
             self.velocity_y = self.jump_velocity
             self.is_jumping = True
 
@@ -50,7 +71,7 @@ class Player:
             self.is_sliding = True
             self.height = 30  # Reduce height when sliding
             self.y = GROUND_HEIGHT - self.height
-            self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+            self.rect.update(self.x, self.y, self.width, self.height)
 
     def stop_slide(self):
         # Stop sliding and restore normal height
@@ -58,7 +79,7 @@ class Player:
             self.is_sliding = False
             self.height = 60
             self.y = GROUND_HEIGHT - self.height
-            self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+            self.rect.update(self.x, self.y, self.width, self.height)
 
     def update(self):
         # Update player position during jump
@@ -69,181 +90,384 @@ class Player:
                 self.y = GROUND_HEIGHT - self.height
                 self.is_jumping = False
                 self.velocity_y = 0
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.y = self.y
 
     def draw(self):
         # Draw player (green when sliding, white otherwise)
         color = GREEN if self.is_sliding else WHITE
         pygame.draw.rect(screen, color, (self.x, self.y, self.width, self.height))
 
-# Obstacle class
-class Obstacle:
-    def __init__(self, x):
-        self.width = 30
-        self.height = random.randint(30, 60)
-        self.x = x
-        self.y = GROUND_HEIGHT - self.height
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-
-    def update(self, speed):
-        # Move obstacle left
-        self.x -= speed
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-
-    def draw(self):
-        # Draw obstacle as a black rectangle
-        pygame.draw.rect(screen, BLACK, (self.x, self.y, self.width, self.height))
-
-# Coin class
-class Coin:
-    def __init__(self, x):
-        self.radius = 15
-        self.x = x
-        self.base_y = GROUND_HEIGHT - 100
-        self.y = self.base_y
-        self.phase = random.uniform(0, 2 * math.pi)
-        self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
+# Column layout of the world arrays
+OBS_X, OBS_Y, OBS_W, OBS_H = range(4)
+COIN_X, COIN_Y, COIN_BASE_Y, COIN_PHASE = range(4)
+COIN_RADIUS = 15
+OBSTACLE_WIDTH = 30
+
+# Obstacles and coins stored as NumPy arrays so scrolling, coin bobbing and
+# collision are one vectorized operation each instead of a Python loop
+class World:
+    __slots__ = ("obstacles", "obstacle_count", "coins", "coin_count", "_bob")
+
+    def __init__(self, capacity=64):
+        self.obstacles = np.zeros((capacity, 4))
+        self.obstacle_count = 0
+        self.coins = np.zeros((capacity, 4))
+        self.coin_count = 0
+        self._bob = np.zeros(capacity)
+
+    @staticmethod
+    def _grow(array):
+        grown = np.zeros((len(array) * 2, array.shape[1]))
+        grown[:len(array)] = array
+        return grown
+
+    def add_obstacle(self, x, height):
+        if self.obstacle_count == len(self.obstacles):
+            self.obstacles = self._grow(self.obstacles)
+        self.obstacles[self.obstacle_count] = (x, GROUND_HEIGHT - height, OBSTACLE_WIDTH, height)
+        self.obstacle_count += 1
+
+    def add_coin(self, x, phase, base_y=GROUND_HEIGHT - 100):
+        if self.coin_count == len(self.coins):
+            self.coins = self._grow(self.coins)
+            self._bob = np.zeros(len(self.coins))
+        self.coins[self.coin_count] = (x, base_y, base_y, phase)
+        self.coin_count += 1
 
     def update(self, speed, time):
-        # Move coin left and apply floating effect
-        self.x -= speed
-        self.y = self.base_y + math.sin(time * 2 + self.phase) * 30
-        self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
+        obstacles = self.obstacles[:self.obstacle_count]
+        coins = self.coins[:self.coin_count]
+        # Scroll everything left
+        obstacles[:, OBS_X] -= speed
+        coins[:, COIN_X] -= speed
+        # Floating effect for all coins at once
+        bob = self._bob[:self.coin_count]
+        np.add(coins[:, COIN_PHASE], time * 2, out=bob)
+        np.sin(bob, out=bob)
+        bob *= 30
+        np.add(coins[:, COIN_BASE_Y], bob, out=coins[:, COIN_Y])
+
+    def hit_obstacles(self, rect):
+        """Indices of obstacles overlapping `rect`."""
+        obstacles = self.obstacles[:self.obstacle_count]
+        x, y = obstacles[:, OBS_X], obstacles[:, OBS_Y]
+        return np.flatnonzero((x < rect.right) & (x + obstacles[:, OBS_W] > rect.left)
+                              & (y < rect.bottom) & (y + obstacles[:, OBS_H] > rect.top))
+
+    def hit_coins(self, rect):
+        """Indices of coins overlapping `rect`."""
+        coins = self.coins[:self.coin_count]
+        x, y = coins[:, COIN_X], coins[:, COIN_Y]
+        return np.flatnonzero((x - COIN_RADIUS < rect.right) & (x + COIN_RADIUS > rect.left)
+                              & (y - COIN_RADIUS < rect.bottom) & (y + COIN_RADIUS > rect.top))
+
+    def remove_offscreen(self, collected=None):
+        # Compact the live rows to the front of each array
+        keep = self.obstacles[:self.obstacle_count, OBS_X] >= -OBSTACLE_WIDTH
+        alive = self.obstacles[:self.obstacle_count][keep]
+        self.obstacle_count = len(alive)
+        self.obstacles[:self.obstacle_count] = alive
+
+        keep = self.coins[:self.coin_count, COIN_X] >= -COIN_RADIUS
+        if collected is not None:
+            keep[collected] = False
+        alive = self.coins[:self.coin_count][keep]
+        self.coin_count = len(alive)
+        self.coins[:self.coin_count] = alive
 
     def draw(self):
-        # Draw coin as a yellow circle
-        pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), self.radius)
+        for x, y, w, h in self.obstacles[:self.obstacle_count].tolist():
+            pygame.draw.rect(screen, BLACK, (x, y, w, h))
+        for x, y in self.coins[:self.coin_count, :COIN_BASE_Y].tolist():
+            pygame.draw.circle(screen, YELLOW, (int(x), int(y)), COIN_RADIUS)
+
+# Level chunks, laid out in pixels at INITIAL_SPEED. Obstacles are
+# (x, height), coins are (x, height above ground). Harder chunks only
+# appear once game_speed reaches min_speed.
+LEVEL_CHUNKS = [
+    {"name": "coin_run", "width": 300, "min_speed": 0,
+     "obstacles": [], "coins": [(50, 100), (110, 100), (170, 100), (230, 100)]},
+    {"name": "single", "width": 350, "min_speed": 0,
+     "obstacles": [(150, 40)], "coins": []},
+    {"name": "tall", "width": 380, "min_speed": 0,
+     "obstacles": [(170, 60)], "coins": [(300, 100)]},
+    {"name": "coin_jump", "width": 400, "min_speed": 0,
+     "obstacles": [(200, 30)], "coins": [(160, 140), (215, 150), (270, 140)]},
+    {"name": "double", "width": 520, "min_speed": 5.5,
+     "obstacles": [(120, 40), (370, 50)], "coins": [(245, 100)]},
+    {"name": "gauntlet", "width": 760, "min_speed": 6.5,
+     "obstacles": [(120, 40), (360, 50), (600, 40)], "coins": [(240, 100), (480, 100)]},
+]
+LEVEL_LOOKAHEAD = WIDTH // 2  # Stream chunks this far past the right edge
+
+# Yields level chunks lazily from a seeded RNG. Prime it with next(), which
+# yields nothing, then send the current game speed to get each chunk;
+# distances are stretched with speed so jumps stay fair.
+def level_chunks(seed):
+    rng = random.Random(seed)
+    speed = yield
+    while True:
+        candidates = [chunk for chunk in LEVEL_CHUNKS if chunk["min_speed"] <= speed]
+        chunk = rng.choice(candidates)
+        scale = max(1.0, speed / INITIAL_SPEED)
+        placed = {
+            "name": chunk["name"],
+            "width": chunk["width"] * scale,
+            "obstacles": [(x * scale, height) for x, height in chunk["obstacles"]],
+            "coins": [(x * scale, height, rng.uniform(0, 2 * math.pi)) for x, height in chunk["coins"]],
+        }
+        speed = yield placed
+
+# Places streamed chunks into the world ahead of the player
+class LevelStreamer:
+    __slots__ = ("chunks", "next_x")
+
+    def __init__(self, seed):
+        self.chunks = level_chunks(seed)
+        next(self.chunks)  # Run to the first yield so send() works; no chunk is lost
+        self.next_x = WIDTH  # Screen x where the next chunk starts
+
+    def update(self, speed, world):
+        self.next_x -= speed
+        while self.next_x < WIDTH + LEVEL_LOOKAHEAD:
+            chunk = self.chunks.send(speed)
+            for x, height in chunk["obstacles"]:
+                world.add_obstacle(self.next_x + x, height)
+            for x, height, phase in chunk["coins"]:
+                world.add_coin(self.next_x + x, phase, GROUND_HEIGHT - height)
+            self.next_x += chunk["width"]
+
+# Parallax layers: (name, top y, height, scroll factor). Each layer is a
+# horizontally tileable strip WIDTH pixels wide, generated once and cached
+# on disk so later launches just load the PNGs.
+PARALLAX_LAYERS = [
+    ("sky", 0, GROUND_HEIGHT, 0.0),
+    ("hills", 0, GROUND_HEIGHT, 0.2),
+    ("props", 0, GROUND_HEIGHT, 0.5),
+    ("ground", GROUND_HEIGHT - 2, HEIGHT - GROUND_HEIGHT + 2, 1.0),
+]
+BACKGROUND_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bg_cache")
+BACKGROUND_VERSION = 1  # Bump when the strip generators change
+BACKGROUND_SEED = 1234
+
+def render_sky(height):
+    strip = pygame.Surface((WIDTH, height))
+    strip.fill((134, 206, 250))  # Blue sky
+    return strip
+
+def render_hills(height):
+    strip = pygame.Surface((WIDTH, height), pygame.SRCALPHA)
+    # Sum of sines whose periods divide WIDTH, so the strip tiles seamlessly
+    points = [(0, height)]
+    for x in range(0, WIDTH + 1, 4):
+        t = 2 * math.pi * x / WIDTH
+        y = height - 90 - 35 * math.sin(2 * t) - 20 * math.sin(5 * t + 1.3) - 10 * math.sin(9 * t + 0.4)
+        points.append((x, y))
+    points.append((WIDTH, height))
+    pygame.draw.polygon(strip, (110, 170, 120), points)
+    return strip
+
+def render_props(height):
+    strip = pygame.Surface((WIDTH, height), pygame.SRCALPHA)
+    rng = random.Random(BACKGROUND_SEED)
+    for _ in range(7):
+        x = rng.randrange(WIDTH)
+        trunk_height = rng.randint(25, 45)
+        radius = rng.randint(14, 24)
+        # Draw wrapped copies so props crossing the edge tile correctly
+        for offset in (-WIDTH, 0, WIDTH):
+            cx = x + offset
+            pygame.draw.rect(strip, (101, 67, 33), (cx - 3, height - trunk_height, 6, trunk_height))
+            pygame.draw.circle(strip, (34, 139, 34), (cx, height - trunk_height), radius)
+    return strip
+
+def render_ground(height):
+    strip = pygame.Surface((WIDTH, height))
+    strip.fill((139, 69, 19))  # Brown ground
+    # Darker dashes make the ground scroll visible
+    for x in range(0, WIDTH, 80):
+        pygame.draw.rect(strip, (120, 58, 15), (x, 15, 40, 6))
+    pygame.draw.line(strip, WHITE, (0, 2), (WIDTH, 2), 5)
+    return strip
+
+LAYER_RENDERERS = {
+    "sky": render_sky,
+    "hills": render_hills,
+    "props": render_props,
+    "ground": render_ground,
+}
+
+_strip_cache = {}
+
+# Load a layer strip from memory, then disk, generating it on first use
+def load_strip(name, height):
+    strip = _strip_cache.get(name)
+    if strip is not None:
+        return strip
+    path = os.path.join(BACKGROUND_CACHE_DIR, f"{name}_{WIDTH}x{height}_v{BACKGROUND_VERSION}.png")
+    strip = None
+    if os.path.exists(path):
+        try:
+            strip = pygame.image.load(path)
+        except pygame.error:
+            strip = None
+    if strip is None:
+        strip = LAYER_RENDERERS[name](height)
+        try:
+            os.makedirs(BACKGROUND_CACHE_DIR, exist_ok=True)
+            pygame.image.save(strip, path)
+        except (OSError, pygame.error) as e:
+            print(f"Could not cache background layer {name}: {e}")
+    strip = strip.convert_alpha() if name in ("hills", "props") else strip.convert()
+    _strip_cache[name] = strip
+    return strip
 
 # Background class
 class Background:
     def __init__(self):
-        self.x1 = 0
-        self.x2 = WIDTH
+        self.layers = [(load_strip(name, height), y, factor) for name, y, height, factor in PARALLAX_LAYERS]
+        self.offsets = [0.0] * len(self.layers)
         self.speed = INITIAL_SPEED
 
     def update(self, speed):
-        # Move background left to create scrolling effect
+        # Offsets stay fractional so slow layers scroll smoothly over time
         self.speed = speed
-        self.x1 -= self.speed
-        self.x2 -= self.speed
-        if self.x1 <= -WIDTH:
-            self.x1 = self.x2 + WIDTH
-        if self.x2 <= -WIDTH:
-            self.x2 = self.x1 + WIDTH
+        for i, (_, _, factor) in enumerate(self.layers):
+            self.offsets[i] = (self.offsets[i] + speed * factor) % WIDTH
 
     def draw(self):
-        # Draw sky and ground
-        screen.fill((134, 206, 250))  # Blue sky
-        pygame.draw.rect(screen, (139, 69, 19), (0, GROUND_HEIGHT, WIDTH, HEIGHT))  # Brown ground
-        # Draw scrolling ground lines
-        pygame.draw.line(screen, WHITE, (self.x1, GROUND_HEIGHT), (self.x1 + WIDTH, GROUND_HEIGHT), 5)
-        pygame.draw.line(screen, WHITE, (self.x2, GROUND_HEIGHT), (self.x2 + WIDTH, GROUND_HEIGHT), 5)
+        # At most two blits per layer: the strip and its wrapped copy
+        for (strip, y, _), offset in zip(self.layers, self.offsets):
+            x = -int(offset + 0.5)
+            screen.blit(strip, (x, y))
+            if x:
+                screen.blit(strip, (x + WIDTH, y))
 
 # Draw score
 def draw_score(score):
-    font = pygame.font.SysFont(None, 36)
-    text = font.render(f"Score: {score}", True, BLACK)
+    text = text_cache.render("small", f"Score: {score}", BLACK)
     screen.blit(text, (10, 10))
 
+# Draw debug metrics
+def draw_debug():
+    text = text_cache.render("small", f"Alloc blocks/frame: {frame_alloc_blocks}", BLACK)
+    screen.blit(text, (10, 40))
+
 # Draw game over screen
 def draw_game_over(score):
-    font = pygame.font.SysFont(None, 48)
-    text = font.render(f"Game Over! Score: {score}", True, BLACK)
+    text = text_cache.render("large", f"Game Over! Score: {score}", BLACK)
     text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
     screen.blit(text, text_rect)
     
     # Draw play again prompt
-    font_small = pygame.font.SysFont(None, 36)
-    play_again_text = font_small.render("Press R to Play Again", True, BLACK)
+    play_again_text = text_cache.render("small", "Press R to Play Again", BLACK)
     play_again_rect = play_again_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 20))
     screen.blit(play_again_text, play_again_rect)
 
 # Initialize game state
-def setup():
-    global player, obstacles, coins, background, score, game_speed, time, game_over
+def setup(seed=None):
+    global player, world, level, level_seed, background, score, game_speed, time, game_over, frame_alloc_blocks
     player = Player()
-    obstacles = []
-    coins = []
+    world = World()
+    if seed is None:
+        seed = int(LEVEL_SEED) if LEVEL_SEED else random.randrange(2 ** 32)
+    level_seed = seed
+    level = LevelStreamer(seed)
     background = Background()
     score = 0
     game_speed = INITIAL_SPEED
     time = 0
     game_over = False
+    frame_alloc_blocks = 0
 
 # Update game state
-def update_loop():
-    global game_speed, time, score, game_over
+def update_game():
+    global game_speed, time, score, game_over, frame_alloc_blocks
+    if game_over:
+        # Check for play again input
+        if inputs.consume(pygame.K_r):
+            setup()  # Reset game state
+        return
+
+    time += 1 / FPS
+    game_speed += SPEED_INCREMENT / FPS
+
+    # Handle input; jump presses are buffered so one made just before
+    # landing still fires instead of being dropped
+    if player.can_jump() and inputs.consume(pygame.K_SPACE, JUMP_BUFFER_MS):
+        player.jump()
+    if inputs.is_held(pygame.K_DOWN):
+        player.slide()
+    else:
+        player.stop_slide()
+
+    blocks_before = sys.getallocatedblocks()
+
+    # Update player
+    player.update()
+
+    # Stream level chunks in ahead of the player
+    level.update(game_speed, world)
+
+    # Move the world and test it against the player in one pass each
+    world.update(game_speed, time)
+    profiler.mark("update")
+    if len(world.hit_obstacles(player.rect)):
+        game_over = True
+    collected = world.hit_coins(player.rect)
+    score += len(collected)
+    world.remove_offscreen(collected)
+    profiler.mark("collide")
+
+    # Update background
+    background.update(game_speed)
+
+    # Net memory blocks allocated by this frame's simulation; should stay flat
+    frame_alloc_blocks = sys.getallocatedblocks() - blocks_before
+
+# Draw the current frame
+def draw_game():
+    background.draw()
     if not game_over:
-        time += 1 / FPS
-        game_speed += SPEED_INCREMENT / FPS
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    player.jump()
-                elif event.key == pygame.K_DOWN:
-                    player.slide()
-            elif event.type == pygame.KEYUP:
-                if event.key == pygame.K_DOWN:
-                    player.stop_slide()
-
-        # Update player
-        player.update()
-
-        # Spawn obstacles randomly
-        if random.random() < 0.02:
-            obstacles.append(Obstacle(WIDTH))
-        # Spawn coins randomly
-        if random.random() < 0.015:
-            coins.append(Coin(WIDTH))
-
-        # Update obstacles
-        for obstacle in obstacles[:]:
-            obstacle.update(game_speed)
-            if obstacle.x < -obstacle.width:
-                obstacles.remove(obstacle)
-            if obstacle.rect.colliderect(player.rect):
-                game_over = True
-
-        # Update coins
-        for coin in coins[:]:
-            coin.update(game_speed, time)
-            if coin.x < -coin.radius:
-                coins.remove(coin)
-            if coin.rect.colliderect(player.rect):
-                coins.remove(coin)
-                score += 1
-
-        # Update background
-        background.update(game_speed)
-
-        # Draw game elements
-        background.draw()
         player.draw()
-        for obstacle in obstacles:
-            obstacle.draw()
-        for coin in coins:
-            coin.draw()
+        world.draw()
         draw_score(score)
+        if DEBUG:
+            draw_debug()
     else:
-        # Draw game over screen
-        background.draw()  # Keep background visible
-        draw_game_over(score)
-        
-        # Check for play again input
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    setup()  # Reset game state
-
-    pygame.display.flip()
+        draw_game_over(score)  # Background stays visible behind it
+
+def init():
+    """Open (or reuse) the window; fonts are loaded on the first call only."""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Infinite Runner")
+    if not text_cache.fonts:
+        text_cache.load("small", 36)
+        text_cache.load("large", 48)
 
 # Main game loop
 async def main():
+    init()
     setup()
+    inputs.clear()
     while True:
-        update_loop()
+        profiler.begin_frame()
+        inputs.poll()
+        if inputs.quit:
+            return
+        for event in inputs.frame_events:
+            profiler.handle_event(event)
+        profiler.mark("input")
+        update_game()
+        profiler.mark("update")
+        draw_game()
+        profiler.draw(screen)
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
         await asyncio.sleep(1.0 / FPS)
 
 # Run the game
@@ -251,4 +475,5 @@ if platform.system() == "Emscripten":
     asyncio.ensure_future(main())
 else:
     if __name__ == "__main__":
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(main())
+        pygame.quit()
\ No newline at end of file
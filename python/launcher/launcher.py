@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+import pygame
+
+GAMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, GAMES_DIR)
+from shared.text_cache import TextCache
+
+# One process for all the pygame games: SDL, the window and the mixer are set
+# up once here, a game module is only imported when it is first picked, and
+# every game's init() reuses the open window. Closing a game's window returns
+# to this menu. Memory Card is a tkinter app and isn't listed.
+WIDTH, HEIGHT = 800, 600
+FPS = 30
+GAMES = [
+    ("tetris", "Tetris"),
+    ("space_invaders", "Space Invaders"),
+    ("infinite_runner", "Infinite Runner"),
+    ("top_down_racer", "Top-Down Racer"),
+]
+
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+YELLOW = (255, 255, 0)
+BLACK = (0, 0, 0)
+
+text_cache = TextCache()
+timings = {}  # module name -> (import ms, init ms) of the last launch
+
+
+def import_game(module_name):
+    """Import a game on first use; later launches get the cached module."""
+    start = time.perf_counter()
+    if module_name not in sys.modules:
+        sys.path.insert(0, os.path.join(GAMES_DIR, module_name))
+    module = importlib.import_module(module_name)
+    return module, (time.perf_counter() - start) * 1000
+
+
+def run_game(module_name):
+    module, import_ms = import_game(module_name)
+    start = time.perf_counter()
+    ready = module.init()
+    init_ms = (time.perf_counter() - start) * 1000
+    timings[module_name] = (import_ms, init_ms)
+    print(f"{module_name}: import {import_ms:.1f} ms, init {init_ms:.1f} ms")
+    if ready is False:  # Window closed during the loading screen
+        return
+    # main() calls init() again, which only re-applies the window size
+    result = module.main()
+    if asyncio.iscoroutine(result):
+        asyncio.run(result)
+    pygame.mixer.music.stop()
+    pygame.mixer.stop()
+
+
+def open_menu():
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Games")
+    pygame.event.clear()
+    return screen
+
+
+def draw_menu(screen, selected):
+    screen.fill(BLACK)
+    title = text_cache.render("title", "Choose a game", WHITE)
+    screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 80))
+    for i, (module_name, label) in enumerate(GAMES):
+        color = YELLOW if i == selected else WHITE
+        text = text_cache.render("item", f"{i + 1}. {label}", color)
+        screen.blit(text, (200, 200 + i * 60))
+        if module_name in timings:
+            import_ms, init_ms = timings[module_name]
+            info = text_cache.render("info", f"import {import_ms:.0f} ms  init {init_ms:.0f} ms", GRAY)
+            screen.blit(info, (200, 236 + i * 60))
+    hint = text_cache.render("info", "Up/Down + Enter or 1-4 to play, Esc to quit", GRAY)
+    screen.blit(hint, (WIDTH // 2 - hint.get_width() // 2, HEIGHT - 60))
+    pygame.display.flip()
+
+
+def main(start_game=None):
+    pygame.init()
+    pygame.mixer.init()
+    text_cache.load("title", 48)
+    text_cache.load("item", 36)
+    text_cache.load("info", 22)
+    screen = open_menu()
+    clock = pygame.time.Clock()
+    if start_game:
+        run_game(start_game)
+        screen = open_menu()
+
+    selected = 0
+    while True:
+        choice = None
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return
+                elif event.key == pygame.K_UP:
+                    selected = (selected - 1) % len(GAMES)
+                elif event.key == pygame.K_DOWN:
+                    selected = (selected + 1) % len(GAMES)
+                elif event.key == pygame.K_RETURN:
+                    choice = selected
+                elif pygame.K_1 <= event.key < pygame.K_1 + len(GAMES):
+                    choice = event.key - pygame.K_1
+        if choice is not None:
+            run_game(GAMES[choice][0])
+            screen = open_menu()
+        draw_menu(screen, selected)
+        clock.tick(FPS)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
+    pygame.quit()
@@ -1,12 +1,252 @@
 import tkinter as tk
 from tkinter import ttk
 import random
+import math
+import io
+import base64
+import sys
+import os
+import time
+import threading
 import pygame
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.trace import get_tracer
+from shared.score_store import ScoreStore
+from shared.assets import AssetManager
+from memory_model import is_match, score_after
+
+# Event trace, off by default (see shared/trace.py); F12 dumps it to TRACE_DUMP_PATH
+trace = get_tracer("memory_card")
+TRACE_DUMP_PATH = "memory_card_trace.txt"
+
+# Score history lives in SQLite next to this file; highscore.txt is only read
+# once to import the old single high score
+GAME_NAME = "memory_card"
+SCORES_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scores.db")
+LEGACY_HIGH_SCORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "highscore.txt")
+
+# Board canvas and card colours
+BOARD_WIDTH = 760
+BOARD_HEIGHT = 400
+CARD_GAP = 8
+CARD_BACK = "#4f46e5"
+CARD_HOVER = "#6b7280"
+CARD_FACE = "#3b82f6"
+BOARD_SIZES = ["4x4", "6x6", "8x8", "10x10", "16x16", "20x20"]
+
+# Deck sources: the classic emoji first, then whole emoji ranges, then
+# generated (shape, colour, filled) symbols drawn into an image atlas
+CLASSIC_EMOJIS = ['🐶', '🐱', '🐭', '🐹', '🐰', '🦊', '🐻', '🐼']
+EMOJI_RANGES = [
+    (0x1F400, 0x1F43F),  # Animals
+    (0x1F345, 0x1F37F),  # Food and drink
+]
+SYMBOL_SHAPES = ["circle", "square", "triangle", "diamond", "star", "hexagon", "cross", "ring"]
+SYMBOL_COLORS = [
+    (239, 68, 68), (249, 115, 22), (234, 179, 8), (132, 204, 22),
+    (34, 197, 94), (20, 184, 166), (6, 182, 212), (17, 24, 39),
+    (139, 92, 246), (217, 70, 239), (244, 63, 94), (255, 255, 255),
+]
+ATLAS_COLUMNS = 16
+
+def emoji_faces():
+    faces = list(CLASSIC_EMOJIS)
+    for first, last in EMOJI_RANGES:
+        for code in range(first, last + 1):
+            if chr(code) not in faces:
+                faces.append(chr(code))
+    return faces
+
+def symbol_faces():
+    return [(shape, color, filled) for filled in (True, False)
+            for shape in SYMBOL_SHAPES for color in SYMBOL_COLORS]
+
+def max_pairs():
+    return len(emoji_faces()) + len(symbol_faces())
+
+def make_deck(pairs, rng=random):
+    """Pick `pairs` distinct faces: classic emoji first, then a random mix of the rest."""
+    if pairs > max_pairs():
+        raise ValueError(f"Board needs {pairs} pairs, only {max_pairs()} faces available")
+    emojis = emoji_faces()
+    classic = emojis[:len(CLASSIC_EMOJIS)]
+    if pairs <= len(classic):
+        return classic[:pairs]
+    extra = rng.sample(emojis[len(classic):] + symbol_faces(), pairs - len(classic))
+    return classic + extra
+
+def polygon_points(shape, cx, cy, r):
+    if shape == "square":
+        return [(cx - r, cy - r), (cx + r, cy - r), (cx + r, cy + r), (cx - r, cy + r)]
+    if shape == "diamond":
+        return [(cx, cy - r), (cx + r, cy), (cx, cy + r), (cx - r, cy)]
+    if shape == "cross":
+        t = r / 3
+        return [(cx - t, cy - r), (cx + t, cy - r), (cx + t, cy - t), (cx + r, cy - t),
+                (cx + r, cy + t), (cx + t, cy + t), (cx + t, cy + r), (cx - t, cy + r),
+                (cx - t, cy + t), (cx - r, cy + t), (cx - r, cy - t), (cx - t, cy - t)]
+    corners = {"triangle": 3, "hexagon": 6, "star": 10}[shape]
+    points = []
+    for i in range(corners):
+        angle = -math.pi / 2 + 2 * math.pi * i / corners
+        radius = r * 0.45 if shape == "star" and i % 2 else r
+        points.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+    return points
+
+def draw_symbol(surface, x, y, size, shape, color, filled):
+    cx, cy, r = x + size / 2, y + size / 2, size * 0.42
+    width = 0 if filled else max(2, size // 12)
+    if shape == "circle":
+        pygame.draw.circle(surface, color, (cx, cy), r, width)
+    elif shape == "ring":
+        pygame.draw.circle(surface, color, (cx, cy), r, max(3, size // 6) if filled else max(2, size // 12))
+        pygame.draw.circle(surface, color, (cx, cy), r * 0.3, 0 if filled else max(1, size // 16))
+    else:
+        pygame.draw.polygon(surface, color, polygon_points(shape, cx, cy, r), width)
+
+def build_symbol_atlas(size):
+    """Rasterise every symbol face once into one PhotoImage; returns (atlas, {face: (x, y)})."""
+    faces = symbol_faces()
+    rows = -(-len(faces) // ATLAS_COLUMNS)
+    surface = pygame.Surface((ATLAS_COLUMNS * size, rows * size), pygame.SRCALPHA)
+    positions = {}
+    for i, face in enumerate(faces):
+        row, col = divmod(i, ATLAS_COLUMNS)
+        positions[face] = (col * size, row * size)
+        draw_symbol(surface, col * size, row * size, size, *face)
+    buffer = io.BytesIO()
+    pygame.image.save(surface, buffer, "atlas.png")
+    atlas = tk.PhotoImage(data=base64.b64encode(buffer.getvalue()), format="png")
+    return atlas, positions
+
+# Sound effects: file, and minimum seconds between plays of that sound
+SOUND_EFFECTS = {
+    "flip": ("flip.wav", 0.08),
+    "match": ("match.wav", 0.2),
+    "no_match": ("no_match.wav", 0.2),
+    "win": ("win.wav", 1.0),
+}
+MUSIC_FILE = "background_music.mp3"
+AUDIO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Mixer init and decoding run on a background thread so the window appears
+# immediately; sounds requested before loading finishes are skipped. Each
+# effect has its own reserved channel, so a new flip cuts off the previous
+# flip instead of stacking up, and plays are rate limited per sound.
+class GameAudio:
+    def __init__(self):
+        self.assets = AssetManager(AUDIO_DIR)
+        self.sounds = {}
+        self.channels = {}
+        self.last_played = {}
+        self.music_wanted = True
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+        self.loader = threading.Thread(target=self.load, name="audio-loader", daemon=True)
+        self.loader.start()
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            pygame.mixer.init()
+            pygame.mixer.set_reserved(len(SOUND_EFFECTS))
+            for channel_id, (name, (filename, _)) in enumerate(SOUND_EFFECTS.items()):
+                sound = self.assets.sound(filename)
+                if sound is None:
+                    trace.error("sound_load_failed", sound=name)
+                    continue
+                self.sounds[name] = sound
+                self.channels[name] = pygame.mixer.Channel(channel_id)
+            self.assets.music(MUSIC_FILE, volume=0.3)
+        except (pygame.error, FileNotFoundError) as e:
+            trace.error("audio_init_failed", error=str(e))
+        with self.lock:
+            self.ready.set()
+            if self.music_wanted:
+                self.start_music()
+        trace.info("audio_ready", ms=round((time.perf_counter() - start) * 1000, 1),
+                   files={name: round(ms, 1) for name, ms in self.assets.load_times.items()})
+
+    def play(self, name):
+        if not self.ready.is_set() or name not in self.sounds:
+            return
+        now = time.monotonic()
+        if now - self.last_played.get(name, -1e9) < SOUND_EFFECTS[name][1]:
+            return
+        self.last_played[name] = now
+        try:
+            self.channels[name].play(self.sounds[name])
+        except pygame.error:
+            trace.error("sound_play_failed", sound=name)
+
+    def start_music(self):
+        try:
+            pygame.mixer.music.stop()
+            pygame.mixer.music.play(-1)
+        except pygame.error:
+            trace.error("music_restart_failed")
+
+    def restart_music(self):
+        with self.lock:
+            self.music_wanted = True
+            if self.ready.is_set():
+                self.start_music()
+
+    def stop_music(self):
+        with self.lock:
+            self.music_wanted = False
+            if self.ready.is_set():
+                try:
+                    pygame.mixer.music.stop()
+                except pygame.error:
+                    trace.error("music_stop_failed")
+
+    def quit(self):
+        self.loader.join(timeout=2.0)
+        try:
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
+        except pygame.error:
+            trace.error("pygame_cleanup_failed")
+
+def format_time(seconds):
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+# Stats shown in the header labels. set() records new values; all changes
+# made in one event-loop turn are flushed together from a single after_idle
+# callback, and only labels whose text actually changed are reconfigured.
+class StatsView:
+    def __init__(self, root, labels, formats):
+        self.root = root
+        self.labels = labels  # field -> ttk.Label
+        self.formats = formats  # field -> value -> label text
+        self.values = {}
+        self.shown = {}
+        self.dirty = set()
+        self.flush_id = None
+
+    def set(self, **values):
+        for field, value in values.items():
+            if field not in self.values or self.values[field] != value:
+                self.values[field] = value
+                self.dirty.add(field)
+        if self.dirty and self.flush_id is None:
+            self.flush_id = self.root.after_idle(self.flush)
+
+    def flush(self):
+        self.flush_id = None
+        for field in self.dirty:
+            text = self.formats[field](self.values[field])
+            if self.shown.get(field) != text:
+                self.labels[field].configure(text=text)
+                self.shown[field] = text
+        self.dirty.clear()
+
 class MemoryGame:
-    def __init__(self, root):
-        print("Initializing MemoryGame")
-        pygame.mixer.init()
+    def __init__(self, root, rows=4, cols=4):
+        trace.info("init")
+        self.audio = GameAudio()
         
         self.root = root
         self.root.title("Memory Card Game")
@@ -16,9 +256,16 @@ class MemoryGame:
         self.root.option_add("*Font", "Arial")
         
         self.root.protocol("WM_DELETE_WINDOW", self.cleanup)
+        self.root.bind("<F12>", lambda e: trace.dump(TRACE_DUMP_PATH))
         
-        self.emojis = ['🐶', '🐱', '🐭', '🐹', '🐰', '🦊', '🐻', '🐼']
-        self.cards = []
+        self.set_board_size(rows, cols)
+        self.card_faces = []  # Face of each card, row-major: emoji str or symbol tuple
+        self.face_up = []
+        self.matched = []
+        self.card_items = []  # (rectangle, text, image) ids per card, reused across games
+        self.atlases = {}  # Symbol atlas per face size, kept across restarts
+        self.face_images = {}  # (face size, symbol) -> PhotoImage cut from the atlas
+        self.hover_index = None
         self.first_card = None
         self.second_card = None
         self.has_flipped_card = False
@@ -26,26 +273,14 @@ class MemoryGame:
         self.score = 0
         self.moves = 0
         self.seconds = 0
+        self.started_at = None  # time.monotonic() when the current game started
         self.matched_pairs = 0
-        self.total_pairs = len(self.emojis)
         self.timer_running = False
         self.timer_id = None
-        self.high_score = self.load_high_score()
-        
-        self.flip_sound = None
-        self.match_sound = None
-        self.no_match_sound = None
-        self.win_sound = None
-        try:
-            self.flip_sound = pygame.mixer.Sound("flip.wav")
-            self.match_sound = pygame.mixer.Sound("match.wav")
-            self.no_match_sound = pygame.mixer.Sound("no_match.wav")
-            self.win_sound = pygame.mixer.Sound("win.wav")
-            pygame.mixer.music.load("background_music.mp3")
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-        except pygame.error as e:
-            print(f"Error loading sound files: {e}")
+        self.unflip_id = None
+        self.high_score = 0
+        self.scores = ScoreStore(SCORES_DB_PATH, schedule=self.root.after)
+        self.load_high_score()
         
         self.style = ttk.Style()
         self.style.configure("TButton", font=("Arial", 12, "bold"), padding=10)
@@ -56,29 +291,50 @@ class MemoryGame:
         self.create_ui()
         self.init_game()
     
+    def board_key(self):
+        return f"{self.rows}x{self.cols}"
+    
     def load_high_score(self):
-        """Load the high score from a file."""
-        print("Loading high score")
+        """Ask the score store for this board size's best score; arrives via on_high_score_loaded."""
+        trace.debug("load_high_score", board=self.board_key())
+        board = self.board_key()
+        self.scores.best(GAME_NAME, board, callback=lambda best: self.on_high_score_loaded(board, best))
+    
+    def on_high_score_loaded(self, board, best):
+        if isinstance(best, Exception):
+            trace.error("high_score_load_failed", error=str(best))
+            return
+        if board != self.board_key():
+            return  # Board size changed while the query was queued
+        if best is None and board == "4x4":
+            best = self.import_legacy_high_score()
+        trace.info("high_score_loaded", board=board, score=best)
+        self.high_score = max(self.high_score, best or 0)
+        self.update_stats()
+    
+    def import_legacy_high_score(self):
+        """Carry the old single-integer highscore.txt over into the score store once."""
         try:
-            with open("highscore.txt", "r") as file:
+            with open(LEGACY_HIGH_SCORE_PATH, "r") as file:
                 score = int(file.read().strip())
-                print(f"High score loaded: {score}")
-                return score
         except (FileNotFoundError, ValueError):
-            print("No high score file found or invalid data, starting with 0")
-            return 0
+            trace.warning("high_score_missing")
+            return None
+        self.scores.record(GAME_NAME, score, board="4x4")
+        return score
     
-    def save_high_score(self):
-        """Save the high score to a file."""
-        print(f"Saving high score: {self.high_score}")
-        try:
-            with open("highscore.txt", "w") as file:
-                file.write(str(self.high_score))
-        except IOError:
-            print("Error saving high score")
+    def save_score(self):
+        """Queue this game's result; the write happens on the store's worker thread."""
+        trace.info("save_score", score=self.score, board=self.board_key())
+        self.scores.record(GAME_NAME, self.score, self.moves, self.seconds, self.board_key(),
+                           callback=self.on_score_saved)
+    
+    def on_score_saved(self, result):
+        if isinstance(result, Exception):
+            trace.error("score_save_failed", error=str(result))
     
     def create_ui(self):
-        print("Creating UI")
+        trace.debug("create_ui")
         self.main_frame = tk.Frame(self.root, bg="#e0e7ff")
         self.main_frame.pack(expand=True, fill="both", padx=20, pady=20)
         
@@ -100,23 +356,38 @@ class MemoryGame:
         self.timer_label = ttk.Label(self.stats_frame, text="Time: 00:00", style="Stats.TLabel")
         self.timer_label.pack(side="left", padx=10)
         
+        self.stats = StatsView(
+            self.root,
+            {"score": self.score_label, "high_score": self.high_score_label,
+             "moves": self.moves_label, "seconds": self.timer_label},
+            {"score": "Score: {}".format, "high_score": "High Score: {}".format,
+             "moves": "Moves: {}".format, "seconds": lambda seconds: f"Time: {format_time(seconds)}"},
+        )
+        
         self.restart_button = ttk.Button(self.stats_frame, text="Play Again", command=self.init_game, style="TButton")
         self.restart_button.pack(side="left", padx=10)
         
-        self.board_frame = tk.Frame(self.main_frame, bg="#e0e7ff")
-        self.board_frame.pack(pady=20)
+        self.size_choice = tk.StringVar(value=f"{self.rows}x{self.cols}")
+        self.size_box = ttk.Combobox(self.stats_frame, textvariable=self.size_choice, values=BOARD_SIZES,
+                                     width=6, state="readonly")
+        self.size_box.pack(side="left", padx=10)
+        self.size_box.bind("<<ComboboxSelected>>", self.on_size_selected)
         
-        for i in range(4):
-            self.board_frame.grid_rowconfigure(i, weight=1)
-            self.board_frame.grid_columnconfigure(i, weight=1)
+        # All cards live on one canvas; clicks are hit-tested arithmetically
+        self.board = tk.Canvas(self.main_frame, width=BOARD_WIDTH, height=BOARD_HEIGHT,
+                               bg="#e0e7ff", highlightthickness=0)
+        self.board.pack(pady=20)
+        self.board.bind("<Button-1>", self.on_board_click)
+        self.board.bind("<Motion>", self.on_board_motion)
+        self.board.bind("<Leave>", lambda e: self.set_hover(None))
     
     def create_win_dialog(self):
-        print("Creating win dialog")
+        trace.debug("create_win_dialog")
         if hasattr(self, 'win_dialog'):
             try:
                 self.win_dialog.destroy()
             except tk.TclError:
-                print("Error destroying previous win dialog")
+                trace.error("win_dialog_destroy_failed")
         
         self.win_dialog = tk.Toplevel(self.root)
         self.win_dialog.transient(self.root)
@@ -135,8 +406,9 @@ class MemoryGame:
         
         self.win_dialog.withdraw()
     
+    @trace.timed
     def init_game(self):
-        print("Initializing game")
+        trace.info("init_game", rows=self.rows, cols=self.cols)
         self.score = 0
         self.moves = 0
         self.seconds = 0
@@ -150,172 +422,262 @@ class MemoryGame:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
         self.timer_running = False
+        if self.unflip_id is not None:
+            self.root.after_cancel(self.unflip_id)
+            self.unflip_id = None
         
-        for widget in self.board_frame.winfo_children():
-            widget.destroy()
-        self.cards = []
+        self.audio.restart_music()
         
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.music.play(-1)
-        except pygame.error:
-            print("Error restarting background music")
-        
-        game_emojis = self.emojis + self.emojis
-        random.shuffle(game_emojis)
-        
-        for i, emoji in enumerate(game_emojis):
-            row, col = divmod(i, 4)
-            card = tk.Button(self.board_frame, text="?", font=("Segoe UI Emoji", 24), bg="#4f46e5", fg="white",
-                             width=10, height=5, relief="raised", borderwidth=2, compound="center",
-                             command=lambda idx=i: self.flip_card(idx))
-            card.grid(row=row, column=col, padx=8, pady=8, sticky="nsew")
-            card.emoji = emoji
-            card.bind("<Enter>", lambda e, c=card: c.configure(bg="#6b7280") if c["state"] != "disabled" else None)
-            card.bind("<Leave>", lambda e, c=card: c.configure(bg="#4f46e5") if c["state"] != "disabled" else None)
-            self.cards.append(card)
+        pair_faces = make_deck(self.total_pairs)
+        self.card_faces = pair_faces + pair_faces
+        random.shuffle(self.card_faces)
+        self.face_up = [False] * len(self.card_faces)
+        self.matched = [False] * len(self.card_faces)
+        self.hover_index = None
+        self.layout_board()
         
         self.create_win_dialog()
         self.update_stats()
+        self.started_at = time.monotonic()
         self.timer_running = True
         self.update_timer()
     
+    def set_board_size(self, rows, cols):
+        if rows * cols % 2:
+            raise ValueError("Board must have an even number of cards")
+        if rows * cols // 2 > max_pairs():
+            raise ValueError(f"Board is too large, at most {max_pairs()} pairs are available")
+        self.rows = rows
+        self.cols = cols
+        self.total_pairs = rows * cols // 2
+    
+    def on_size_selected(self, event):
+        rows, cols = (int(n) for n in self.size_choice.get().split("x"))
+        self.set_board_size(rows, cols)
+        self.high_score = 0
+        self.load_high_score()
+        self.init_game()
+    
+    def face_size(self):
+        card_w, card_h = self.card_size()
+        return max(8, int(min(card_w, card_h) * 0.7))
+    
+    def face_image(self, face):
+        """PhotoImage for a symbol face, cut once from the cached atlas for this size."""
+        size = self.face_size()
+        key = (size, face)
+        image = self.face_images.get(key)
+        if image is None:
+            if size not in self.atlases:
+                self.atlases[size] = build_symbol_atlas(size)
+            atlas, positions = self.atlases[size]
+            x, y = positions[face]
+            image = tk.PhotoImage(width=size, height=size)
+            image.tk.call(image, "copy", atlas, "-from", x, y, x + size, y + size)
+            self.face_images[key] = image
+        return image
+    
+    def card_size(self):
+        card_w = (BOARD_WIDTH - CARD_GAP * (self.cols - 1)) / self.cols
+        card_h = (BOARD_HEIGHT - CARD_GAP * (self.rows - 1)) / self.rows
+        return card_w, card_h
+    
+    @trace.timed
+    def layout_board(self):
+        """Position one rectangle and text item per card, reusing existing items."""
+        count = len(self.card_faces)
+        while len(self.card_items) < count:
+            rect = self.board.create_rectangle(0, 0, 0, 0, outline="#1e1b4b", width=2)
+            text = self.board.create_text(0, 0, fill="white")
+            image = self.board.create_image(0, 0, state="hidden")
+            self.card_items.append((rect, text, image))
+        while len(self.card_items) > count:
+            self.board.delete(*self.card_items.pop())
+        
+        card_w, card_h = self.card_size()
+        font = ("Segoe UI Emoji", -max(8, int(min(card_w, card_h) * 0.5)))
+        for index, (rect, text, image) in enumerate(self.card_items):
+            row, col = divmod(index, self.cols)
+            x = col * (card_w + CARD_GAP)
+            y = row * (card_h + CARD_GAP)
+            self.board.coords(rect, x, y, x + card_w, y + card_h)
+            self.board.coords(text, x + card_w / 2, y + card_h / 2)
+            self.board.coords(image, x + card_w / 2, y + card_h / 2)
+            self.board.itemconfigure(text, font=font)
+            self.draw_card(index)
+    
+    def draw_card(self, index, color=None):
+        rect, text, image = self.card_items[index]
+        face = self.card_faces[index]
+        shown = self.face_up[index] or self.matched[index]
+        if color is None:
+            color = CARD_FACE if shown else CARD_BACK
+        self.board.itemconfigure(rect, fill=color)
+        if shown and not isinstance(face, str):
+            self.board.itemconfigure(text, text="")
+            self.board.itemconfigure(image, image=self.face_image(face), state="normal")
+        else:
+            self.board.itemconfigure(text, text=face if shown else "?")
+            self.board.itemconfigure(image, state="hidden")
+    
+    def card_at(self, x, y):
+        """Index of the card under canvas point (x, y), or None for gaps/outside."""
+        card_w, card_h = self.card_size()
+        col, x_in = divmod(x, card_w + CARD_GAP)
+        row, y_in = divmod(y, card_h + CARD_GAP)
+        if not (0 <= col < self.cols and 0 <= row < self.rows) or x_in > card_w or y_in > card_h:
+            return None
+        return int(row) * self.cols + int(col)
+    
+    def is_clickable(self, index):
+        return not self.face_up[index] and not self.matched[index]
+    
+    def set_hover(self, index):
+        if index == self.hover_index:
+            return
+        if self.hover_index is not None:
+            self.draw_card(self.hover_index)
+        self.hover_index = index
+        if index is not None and self.is_clickable(index):
+            self.draw_card(index, CARD_HOVER)
+    
+    def on_board_motion(self, event):
+        self.set_hover(self.card_at(event.x, event.y))
+    
+    @trace.timed
+    def on_board_click(self, event):
+        index = self.card_at(event.x, event.y)
+        if index is not None:
+            self.flip_card(index)
+    
+    @trace.timed
     def flip_card(self, index):
-        print(f"Flipping card {index}")
-        if self.lock_board or self.cards[index] == self.first_card or self.cards[index]["state"] == "disabled":
+        trace.debug("flip_card", index=index)
+        if self.lock_board or not self.is_clickable(index):
             return
         
-        card = self.cards[index]
-        card.configure(text=card.emoji, bg="#3b82f6")
+        self.face_up[index] = True
+        self.draw_card(index)
         
-        if self.flip_sound:
-            try:
-                self.flip_sound.play()
-            except pygame.error:
-                print("Error playing flip sound")
+        self.audio.play("flip")
         
         if not self.has_flipped_card:
             self.has_flipped_card = True
-            self.first_card = card
+            self.first_card = index
         else:
-            self.second_card = card
+            self.second_card = index
             self.moves += 1
             self.update_stats()
             self.check_for_match()
     
+    @trace.timed
     def check_for_match(self):
-        print("Checking for match")
-        if self.first_card.emoji == self.second_card.emoji:
-            self.score += 100
-            print(f"Match found! Score increased by 100 to {self.score}")
+        trace.debug("check_for_match")
+        first, second = self.first_card, self.second_card
+        matched = is_match(self.card_faces, first, second)
+        self.score = score_after(self.score, matched)
+        if matched:
+            trace.info("match", score=self.score)
             self.matched_pairs += 1
-            self.first_card.configure(state="disabled", bg="#3b82f6")
-            self.second_card.configure(state="disabled", bg="#3b82f6")
-            if self.match_sound:
-                try:
-                    self.match_sound.play()
-                except pygame.error:
-                    print("Error playing match sound")
+            self.matched[first] = self.matched[second] = True
+            self.audio.play("match")
             self.reset_board()
             self.update_stats()
             
             if self.matched_pairs == self.total_pairs:
                 self.end_game()
         else:
-            self.score = max(0, self.score - 10)
-            print(f"No match. Score decreased by 10 to {self.score}")
+            trace.info("no_match", score=self.score)
             self.lock_board = True
-            if self.no_match_sound:
-                try:
-                    self.no_match_sound.play()
-                except pygame.error:
-                    print("Error playing no_match sound")
-            self.root.after(1000, self.unflip_cards)
+            self.audio.play("no_match")
+            self.unflip_id = self.root.after(1000, self.unflip_cards)
     
+    @trace.timed
     def unflip_cards(self):
-        print("Unflipping cards")
-        self.first_card.configure(text="?", bg="#4f46e5")
-        self.second_card.configure(text="?", bg="#4f46e5")
+        trace.debug("unflip_cards")
+        self.unflip_id = None
+        for index in (self.first_card, self.second_card):
+            self.face_up[index] = False
+            self.draw_card(index)
         self.reset_board()
     
     def reset_board(self):
-        print("Resetting board")
+        trace.debug("reset_board")
         self.has_flipped_card = False
         self.lock_board = False
         self.first_card = None
         self.second_card = None
     
+    @trace.timed
     def update_stats(self):
-        self.score_label.configure(text=f"Score: {self.score}")
-        self.high_score_label.configure(text=f"High Score: {self.high_score}")
-        self.moves_label.configure(text=f"Moves: {self.moves}")
-        minutes = self.seconds // 60
-        seconds = self.seconds % 60
-        self.timer_label.configure(text=f"Time: {minutes:02d}:{seconds:02d}")
+        self.stats.set(score=self.score, high_score=self.high_score, moves=self.moves, seconds=self.seconds)
     
+    @trace.timed
     def update_timer(self):
         if self.timer_running:
-            self.seconds += 1
+            # Derive the time from the monotonic clock so late callbacks don't drift,
+            # and schedule the next tick for just after the next whole second
+            elapsed = time.monotonic() - self.started_at
+            self.seconds = int(elapsed)
             self.update_stats()
-            self.timer_id = self.root.after(1000, self.update_timer)
+            self.timer_id = self.root.after(int((1 - elapsed % 1) * 1000) + 1, self.update_timer)
     
+    @trace.timed
     def end_game(self):
-        print("Ending game")
+        self.seconds = int(time.monotonic() - self.started_at)
+        trace.info("end_game", score=self.score, moves=self.moves, seconds=self.seconds)
         self.timer_running = False
         if self.timer_id is not None:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
         
-        # Update high score if current score is higher
+        # Every result is kept; the high score shown is the best for this board size
+        self.save_score()
         if self.score > self.high_score:
             self.high_score = self.score
-            self.save_high_score()
-            print(f"New high score: {self.high_score}")
+            trace.info("new_high_score", score=self.high_score)
         
-        try:
-            pygame.mixer.music.stop()
-            if self.win_sound:
-                self.win_sound.play()
-        except pygame.error:
-            print("Error handling audio in end_game")
+        self.audio.stop_music()
+        self.audio.play("win")
         
-        message = f"You completed the game!\nScore: {self.score}\nHigh Score: {self.high_score}\nMoves: {self.moves}\nTime: {self.timer_label.cget('text').split(': ')[1]}"
+        message = f"You completed the game!\nScore: {self.score}\nHigh Score: {self.high_score}\nMoves: {self.moves}\nTime: {format_time(self.seconds)}"
         try:
             self.win_message.configure(text=message)
             self.win_dialog.deiconify()
-            print("Win dialog shown")
+            trace.debug("win_dialog_shown")
         except tk.TclError:
-            print("Error showing win dialog")
+            trace.error("win_dialog_show_failed")
     
     def play_again(self):
-        print("Play again triggered")
+        trace.debug("play_again")
         try:
             self.win_dialog.withdraw()
             self.win_dialog.destroy()
         except tk.TclError:
-            print("Error destroying win dialog in play_again")
+            trace.error("win_dialog_destroy_failed", where="play_again")
         self.init_game()
     
     def cleanup(self):
-        print("Cleaning up")
+        trace.info("cleanup")
         self.timer_running = False
         if self.timer_id is not None:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
-        try:
-            pygame.mixer.music.stop()
-            pygame.mixer.quit()
-        except pygame.error:
-            print("Error cleaning up pygame")
+        self.audio.quit()
         try:
             if hasattr(self, 'win_dialog'):
                 self.win_dialog.destroy()
         except tk.TclError:
-            print("Error destroying win dialog in cleanup")
+            trace.error("win_dialog_destroy_failed", where="cleanup")
+        self.scores.close()
         self.root.destroy()
 
 if __name__ == "__main__":
-    print("Starting main loop")
+    trace.info("mainloop_start")
+    # Optional board size argument, e.g. `python memory_card.py 10x10`
+    rows, cols = 4, 4
+    if len(sys.argv) > 1:
+        rows, cols = (int(n) for n in sys.argv[1].split("x"))
     root = tk.Tk()
-    game = MemoryGame(root)
+    game = MemoryGame(root, rows, cols)
     root.mainloop()
\ No newline at end of file
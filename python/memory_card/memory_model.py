@@ -0,0 +1,117 @@
+import random
+from collections import deque
+
+# Scoring rules, shared by the Tk game and the simulator
+MATCH_POINTS = 100
+MISS_PENALTY = 10
+
+def is_match(faces, first, second):
+    return first != second and faces[first] == faces[second]
+
+def score_after(score, matched):
+    """Score after one pair of flips: +MATCH_POINTS for a match, -MISS_PENALTY (floor 0) otherwise."""
+    if matched:
+        return score + MATCH_POINTS
+    return max(0, score - MISS_PENALTY)
+
+def make_faces(pairs, rng=random):
+    faces = list(range(pairs)) * 2
+    rng.shuffle(faces)
+    return faces
+
+# Board state and rules without any UI, so games can be simulated in bulk
+class MemoryModel:
+    __slots__ = ("faces", "matched", "score", "moves", "matched_pairs", "total_pairs")
+
+    def __init__(self, faces):
+        self.faces = faces
+        self.matched = [False] * len(faces)
+        self.score = 0
+        self.moves = 0
+        self.matched_pairs = 0
+        self.total_pairs = len(faces) // 2
+
+    @property
+    def done(self):
+        return self.matched_pairs == self.total_pairs
+
+    def play_pair(self, first, second):
+        """Flip two cards as one move; returns True when they match."""
+        matched = is_match(self.faces, first, second)
+        self.moves += 1
+        self.score = score_after(self.score, matched)
+        if matched:
+            self.matched[first] = self.matched[second] = True
+            self.matched_pairs += 1
+        return matched
+
+# Simulated player that remembers the last `memory` cards it has seen.
+# memory=None is perfect memory, memory=0 flips unmatched cards at random.
+class SimulatedPlayer:
+    def __init__(self, memory=None, rng=random):
+        self.memory = memory
+        self.rng = rng
+
+    def play(self, model):
+        rng = self.rng
+        seen = {}  # index -> face, insertion ordered so the oldest is forgotten first
+        order = deque()
+        unseen = list(range(len(model.faces)))
+        rng.shuffle(unseen)
+        unmatched = list(range(len(model.faces)))
+
+        def remember(index):
+            if self.memory == 0 or index in seen:
+                return
+            seen[index] = model.faces[index]
+            order.append(index)
+            if self.memory is not None and len(order) > self.memory:
+                del seen[order.popleft()]
+
+        def forget(index):
+            if index in seen:
+                del seen[index]
+                order.remove(index)
+
+        def pick_unknown(exclude=None):
+            # Prefer a card never flipped; otherwise any unmatched card not remembered
+            while unseen and model.matched[unseen[-1]]:
+                unseen.pop()
+            if unseen:
+                return unseen.pop()
+            while True:
+                index = rng.choice(unmatched)
+                if index != exclude and (index not in seen or len(seen) >= len(unmatched) - 1):
+                    return index
+
+        def known_partner(index):
+            face = model.faces[index]
+            for other, other_face in seen.items():
+                if other != index and other_face == face:
+                    return other
+            return None
+
+        while not model.done:
+            # A remembered pair is played straight away
+            pair = None
+            by_face = {}
+            for index, face in seen.items():
+                if face in by_face:
+                    pair = (by_face[face], index)
+                    break
+                by_face[face] = index
+            if pair:
+                first, second = pair
+            else:
+                first = pick_unknown()
+                remember(first)
+                second = known_partner(first)
+                if second is None:
+                    second = pick_unknown(exclude=first)
+                    remember(second)
+            if model.play_pair(first, second):
+                forget(first)
+                forget(second)
+                unmatched.remove(first)
+                unmatched.remove(second)
+        return model
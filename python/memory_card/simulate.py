@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from memory_model import MemoryModel, SimulatedPlayer, make_faces
+
+# Batch simulation of Memory Card games for tuning scoring and difficulty.
+# Example: python simulate.py --games 1000000 --boards 4x4 6x6 --players perfect memory:6 random
+
+CHUNK_SIZE = 20000  # Games per worker task
+
+def parse_player(name):
+    """'perfect', 'random' or 'memory:N' -> memory window for SimulatedPlayer."""
+    if name == "perfect":
+        return None
+    if name == "random":
+        return 0
+    if name.startswith("memory:"):
+        return int(name.split(":", 1)[1])
+    raise ValueError(f"Unknown player {name!r}")
+
+def run_chunk(board, player, games, seed):
+    rows, cols = (int(n) for n in board.split("x"))
+    rng = random.Random(seed)
+    player_ai = SimulatedPlayer(parse_player(player), rng)
+    scores = Counter()
+    moves = Counter()
+    for _ in range(games):
+        model = player_ai.play(MemoryModel(make_faces(rows * cols // 2, rng)))
+        scores[model.score] += 1
+        moves[model.moves] += 1
+    return board, player, scores, moves
+
+def percentile(counts, fraction):
+    target = fraction * sum(counts.values())
+    running = 0
+    for value in sorted(counts):
+        running += counts[value]
+        if running >= target:
+            return value
+    return None
+
+def summarize(counts):
+    total = sum(counts.values())
+    return {
+        "games": total,
+        "mean": round(sum(value * n for value, n in counts.items()) / total, 2),
+        "min": min(counts),
+        "p50": percentile(counts, 0.5),
+        "p95": percentile(counts, 0.95),
+        "max": max(counts),
+    }
+
+def simulate(boards, players, games, seed=0, workers=None):
+    """Play `games` games per (board, player), split into chunks across a process pool."""
+    tasks = []
+    for board in boards:
+        for player in players:
+            for start in range(0, games, CHUNK_SIZE):
+                tasks.append((board, player, min(CHUNK_SIZE, games - start), seed + len(tasks)))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, *task) for task in tasks]
+        for future in futures:
+            board, player, scores, moves = future.result()
+            entry = results.setdefault((board, player), {"scores": Counter(), "moves": Counter()})
+            entry["scores"].update(scores)
+            entry["moves"].update(moves)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Memory Card games with computer players.")
+    parser.add_argument("--games", type=int, default=100000, help="games per board size and player")
+    parser.add_argument("--boards", nargs="+", default=["4x4", "6x6"])
+    parser.add_argument("--players", nargs="+", default=["perfect", "memory:6", "random"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", help="write full score/move distributions to this file")
+    args = parser.parse_args()
+
+    results = simulate(args.boards, args.players, args.games, args.seed, args.workers)
+    report = []
+    for (board, player), entry in results.items():
+        score, moves = summarize(entry["scores"]), summarize(entry["moves"])
+        print(f"{board:>6} {player:<10} score mean {score['mean']:>8} p50 {score['p50']:>6} p95 {score['p95']:>6}"
+              f" | moves mean {moves['mean']:>7} p50 {moves['p50']:>5} p95 {moves['p95']:>5}")
+        report.append({
+            "board": board,
+            "player": player,
+            "score": score,
+            "moves": moves,
+            "score_distribution": dict(sorted(entry["scores"].items())),
+            "moves_distribution": dict(sorted(entry["moves"].items())),
+        })
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
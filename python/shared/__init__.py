@@ -0,0 +1,2 @@
+# Helpers shared by the pygame/tkinter games in this folder.
+# Games add the parent folder to sys.path and import e.g. `shared.text_cache`.
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pygame
+
+
+# Loads images, sounds, fonts and music relative to a game's own folder and
+# caches them, so nothing is decoded twice and the working directory doesn't
+# matter. preload() decodes a manifest on a worker thread while the game
+# shows a loading screen; load_times records how long each asset took.
+class AssetManager:
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.cache = {}
+        self.raw_images = {}  # Decoded but not yet converted for the display
+        self.load_times = {}  # name -> milliseconds
+        self.lock = threading.Lock()
+        self.loaded = 0
+        self.total = 0
+
+    def path(self, name):
+        return os.path.join(self.base_dir, name)
+
+    def _timed(self, name, loader):
+        start = time.perf_counter()
+        result = loader()
+        with self.lock:
+            self.load_times[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    def _decode_image(self, name):
+        raw = self.raw_images.get(name)
+        if raw is None:
+            raw = self._timed(name, lambda: pygame.image.load(self.path(name)))
+            self.raw_images[name] = raw
+        return raw
+
+    def image(self, name, size=None, fallback_color=(255, 0, 255)):
+        """Image converted for the display (and scaled to `size`), or a solid fallback surface."""
+        key = ("image", name, size)
+        image = self.cache.get(key)
+        if image is not None:
+            return image
+        try:
+            image = self._decode_image(name).convert_alpha()
+            if size:
+                image = pygame.transform.scale(image, size)
+        except (FileNotFoundError, pygame.error) as e:
+            print(f"Could not load {name}: {e}. Using fallback surface.")
+            image = pygame.Surface(size or (32, 32))
+            image.fill(fallback_color)
+        self.cache[key] = image
+        return image
+
+    def sound(self, name):
+        """Decoded pygame Sound, or None if the file is missing or the mixer is unavailable."""
+        key = ("sound", name)
+        if key in self.cache:
+            return self.cache[key]
+        try:
+            sound = self._timed(name, lambda: pygame.mixer.Sound(self.path(name)))
+        except (FileNotFoundError, pygame.error) as e:
+            print(f"Warning: '{name}' could not be loaded ({e}). Sound disabled.")
+            sound = None
+        self.cache[key] = sound
+        return sound
+
+    def font(self, name, size):
+        key = ("font", name, size)
+        font = self.cache.get(key)
+        if font is None:
+            font = self._timed(f"{name}@{size}", lambda: pygame.font.Font(self.path(name), size))
+            self.cache[key] = font
+        return font
+
+    def music(self, name, volume=None):
+        """Load `name` into pygame.mixer.music; returns False if it can't be loaded."""
+        try:
+            self._timed(name, lambda: pygame.mixer.music.load(self.path(name)))
+        except (FileNotFoundError, pygame.error) as e:
+            print(f"Warning: '{name}' could not be loaded ({e}). Background music disabled.")
+            return False
+        if volume is not None:
+            pygame.mixer.music.set_volume(volume)
+        return True
+
+    def preload(self, manifest):
+        """Decode (kind, name) pairs on a worker thread; returns the started thread.
+
+        Images are only decoded here, the display conversion happens on first image() call.
+        """
+        self.total += len(manifest)
+
+        def work():
+            for kind, name in manifest:
+                try:
+                    if kind == "image":
+                        self._decode_image(name)
+                    elif kind == "sound":
+                        self.sound(name)
+                except (FileNotFoundError, pygame.error) as e:
+                    print(f"Could not preload {name}: {e}")
+                with self.lock:
+                    self.loaded += 1
+
+        thread = threading.Thread(target=work, name="asset-preload", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def progress(self):
+        return self.loaded / self.total if self.total else 1.0
+
+    def report(self):
+        """Load times, slowest first, one line per asset."""
+        rows = sorted(self.load_times.items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{ms:8.1f} ms  {name}" for name, ms in rows)
+
+
+def show_loading_screen(screen, assets, thread, clock=None, color=(255, 255, 255)):
+    """Draw a progress bar until `thread` finishes; returns False if the window was closed."""
+    clock = clock or pygame.time.Clock()
+    width, height = screen.get_size()
+    bar = pygame.Rect(width // 4, height // 2 - 10, width // 2, 20)
+    while thread.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        screen.fill((0, 0, 0))
+        pygame.draw.rect(screen, color, bar, 2)
+        fill = bar.inflate(-6, -6)
+        fill.width = int(fill.width * assets.progress)
+        pygame.draw.rect(screen, color, fill)
+        pygame.display.flip()
+        clock.tick(30)
+    if os.environ.get("GAME_ASSET_REPORT") == "1":
+        print(assets.report())
+    return True
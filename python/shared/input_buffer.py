@@ -0,0 +1,62 @@
+from collections import deque
+
+import pygame
+
+
+# Drains the pygame event queue once per frame into a ring buffer of
+# timestamped key events. Games query it instead of calling
+# pygame.event.get() themselves, so input is read at one point in the frame
+# and presses can be buffered for a few milliseconds (e.g. jump buffering).
+class InputBuffer:
+    def __init__(self, size=64):
+        self.events = deque(maxlen=size)  # [time_ms, event type, key, consumed]
+        self.frame_events = []  # Raw pygame events from the latest poll
+        self.held = set()
+        self.quit = False
+        self.now = 0
+
+    def poll(self, now=None):
+        """Drain pending events; call exactly once at the start of each frame."""
+        self.now = pygame.time.get_ticks() if now is None else now
+        self.frame_events = pygame.event.get()
+        for event in self.frame_events:
+            if event.type == pygame.QUIT:
+                self.quit = True
+            elif event.type == pygame.KEYDOWN:
+                self.held.add(event.key)
+                self.events.append([self.now, pygame.KEYDOWN, event.key, False])
+            elif event.type == pygame.KEYUP:
+                self.held.discard(event.key)
+                self.events.append([self.now, pygame.KEYUP, event.key, False])
+        return self.frame_events
+
+    def _find(self, event_type, key, window_ms):
+        for entry in reversed(self.events):
+            if self.now - entry[0] > window_ms:
+                break
+            if entry[1] == event_type and entry[2] == key and not entry[3]:
+                return entry
+        return None
+
+    def pressed(self, key, window_ms=0):
+        """True if `key` went down within the last `window_ms` and wasn't consumed."""
+        return self._find(pygame.KEYDOWN, key, window_ms) is not None
+
+    def released(self, key, window_ms=0):
+        return self._find(pygame.KEYUP, key, window_ms) is not None
+
+    def consume(self, key, window_ms=0):
+        """Like pressed(), but marks the press as used so it only fires once."""
+        entry = self._find(pygame.KEYDOWN, key, window_ms)
+        if entry is None:
+            return False
+        entry[3] = True
+        return True
+
+    def is_held(self, key):
+        return key in self.held
+
+    def clear(self):
+        self.events.clear()
+        self.held.clear()
+        self.quit = False
@@ -0,0 +1,143 @@
+import cProfile
+import os
+import time
+from collections import deque
+
+import pygame
+
+
+# Per-frame phase timing for the game loops. Call begin_frame() at the top of
+# the loop, mark("input"), mark("update"), ... after each phase (a mark is
+# charged the time since the previous one) and end_frame() after the flip.
+# F3 toggles an overlay with a frame-time graph and p50/p95/p99; F9 writes a
+# cProfile dump of the next `capture_frames` frames. Marks are two clock reads
+# and a dict update, so the hooks can stay in shipped builds.
+OVERLAY_KEY = pygame.K_F3
+CAPTURE_KEY = pygame.K_F9
+BUDGET_MS = 1000 / 60
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 60
+GRAPH_MAX_MS = 2 * BUDGET_MS
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class FrameProfiler:
+    def __init__(self, name, size=GRAPH_WIDTH, capture_frames=120, dump_dir=None):
+        self.name = name
+        self.frame_ms = deque(maxlen=size)  # Work done between begin_frame and end_frame
+        self.interval_ms = deque(maxlen=size)  # Start-to-start, includes clock.tick waits
+        self.phases = {}  # name -> deque of ms
+        self.current = {}
+        self.frame_start = None
+        self.last = 0.0
+        self.show_overlay = False
+        self.capture_frames = capture_frames
+        self.dump_dir = dump_dir or os.getcwd()
+        self.capture_pending = False
+        self.capture_left = 0
+        self.profile = None
+        self.last_dump = None
+        self.font = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.interval_ms.append((now - self.frame_start) * 1000)
+        self.frame_start = self.last = now
+        self.current.clear()
+        if self.capture_pending:
+            self.capture_pending = False
+            self.capture_left = self.capture_frames
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        self.frame_ms.append((now - self.frame_start) * 1000)
+        for phase, ms in self.current.items():
+            history = self.phases.get(phase)
+            if history is None:
+                history = self.phases[phase] = deque(maxlen=self.frame_ms.maxlen)
+            history.append(ms)
+        if self.profile is not None:
+            self.capture_left -= 1
+            if self.capture_left <= 0:
+                self.finish_capture()
+
+    def handle_event(self, event):
+        """Handle the profiler hotkeys; returns True if the event was one of them."""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == OVERLAY_KEY:
+            self.show_overlay = not self.show_overlay
+            return True
+        if event.key == CAPTURE_KEY:
+            if self.profile is None:
+                self.capture_pending = True
+            return True
+        return False
+
+    def finish_capture(self):
+        self.profile.disable()
+        path = os.path.join(self.dump_dir, f"{self.name}_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        try:
+            self.profile.dump_stats(path)
+            self.last_dump = path
+            print(f"Profile of {self.capture_frames} frames written to {path}")
+        except OSError as e:
+            print(f"Could not write profile {path}: {e}")
+        self.profile = None
+
+    def summary(self):
+        frames = list(self.frame_ms)
+        return {
+            "p50": percentile(frames, 50),
+            "p95": percentile(frames, 95),
+            "p99": percentile(frames, 99),
+            "interval_p95": percentile(list(self.interval_ms), 95),
+            "phases": {phase: sum(ms) / len(ms) for phase, ms in self.phases.items() if ms},
+        }
+
+    def draw(self, surface, x=10, y=10):
+        """Draw the overlay if it is toggled on; call before the flip. Returns the dirty rect."""
+        if not self.show_overlay:
+            return None
+        if self.font is None:
+            self.font = pygame.font.SysFont("monospace", 14)
+        stats = self.summary()
+        lines = [
+            f"frame p50 {stats['p50']:.2f}  p95 {stats['p95']:.2f}  p99 {stats['p99']:.2f} ms",
+            f"interval p95 {stats['interval_p95']:.2f} ms",
+            "  ".join(f"{phase} {ms:.2f}" for phase, ms in stats["phases"].items()),
+        ]
+        if self.profile is not None:
+            lines.append(f"profiling... {self.capture_left} frames left")
+        elif self.last_dump:
+            lines.append(f"saved {os.path.basename(self.last_dump)}")
+        line_height = self.font.get_linesize()
+        width = max(GRAPH_WIDTH, *(self.font.size(line)[0] for line in lines)) + 10
+        height = GRAPH_HEIGHT + line_height * len(lines) + 15
+
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        graph_bottom = 5 + GRAPH_HEIGHT
+        budget_y = graph_bottom - int(BUDGET_MS / GRAPH_MAX_MS * GRAPH_HEIGHT)
+        pygame.draw.line(panel, (90, 90, 90), (5, budget_y), (5 + GRAPH_WIDTH, budget_y))
+        for i, ms in enumerate(self.frame_ms):
+            bar = min(GRAPH_HEIGHT, int(ms / GRAPH_MAX_MS * GRAPH_HEIGHT))
+            color = (80, 220, 80) if ms <= BUDGET_MS else (230, 70, 70)
+            pygame.draw.line(panel, color, (5 + i, graph_bottom), (5 + i, graph_bottom - bar))
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, (255, 255, 255)), (5, graph_bottom + 5 + i * line_height))
+        return surface.blit(panel, (x, y))
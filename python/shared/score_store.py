@@ -0,0 +1,131 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+from shared.trace import get_tracer
+
+
+# Score history in SQLite (WAL mode). All database work runs on one
+# background thread so the game loop / Tk main thread never blocks on disk.
+# The worker never calls back into the UI: results wait in a queue until the
+# owning thread drains it. Tk games pass `schedule=root.after`, which polls
+# the queue every POLL_MS from the main loop; without it callbacks run on the
+# worker thread. The worker is a daemon; close(), also run at exit, waits
+# up to CLOSE_TIMEOUT for queued writes so they aren't lost.
+POLL_MS = 50
+CLOSE_TIMEOUT = 2.0
+
+trace = get_tracer("score_store")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    board TEXT NOT NULL DEFAULT '',
+    score INTEGER NOT NULL,
+    moves INTEGER,
+    seconds INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_leaderboard ON scores (game, board, score DESC);
+"""
+
+
+class ScoreStore:
+    def __init__(self, path, schedule=None):
+        self.path = path
+        self.schedule = schedule
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()  # (callback, result) waiting for poll()
+        self.closed = False
+        self.worker = threading.Thread(target=self._run, name="score-store", daemon=True)
+        self.worker.start()
+        atexit.register(self.close)  # Flush even if the owner never closes us
+        if schedule is not None:
+            schedule(POLL_MS, self._poll)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _run(self):
+        try:
+            connection = self._connect()
+        except Exception as e:
+            trace.error("open_failed", path=self.path, error=str(e))
+            connection, error = None, e
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            work, callback = job
+            if connection is None:
+                result = error  # Every job fails the same way
+            else:
+                try:
+                    with connection:  # One transaction per job, so writes are atomic
+                        result = work(connection)
+                except Exception as e:
+                    result = e
+            if callback is not None and not self.closed:
+                self._deliver(callback, result)
+        if connection is not None:
+            connection.close()
+
+    def _deliver(self, callback, result):
+        if self.schedule is not None:
+            self.results.put((callback, result))
+            return
+        try:
+            callback(result)
+        except Exception as e:
+            trace.error("callback_failed", error=str(e))
+
+    def _poll(self):
+        """Run the callbacks whose results are ready; on the thread that owns `schedule`."""
+        if self.closed:
+            return
+        self.schedule(POLL_MS, self._poll)  # First, so a failing callback doesn't stop polling
+        while True:
+            try:
+                callback, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callback(result)
+
+    def _submit(self, work, callback=None):
+        if self.closed:
+            raise RuntimeError("ScoreStore is closed")
+        self.jobs.put((work, callback))
+
+    def record(self, game, score, moves=None, seconds=None, board="", callback=None):
+        """Queue a score; `callback` gets the new row id (or the exception)."""
+        row = (game, board, score, moves, seconds, time.time())
+        self._submit(lambda db: db.execute(
+            "INSERT INTO scores (game, board, score, moves, seconds, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            row).lastrowid, callback)
+
+    def best(self, game, board="", callback=None):
+        """`callback` gets the highest score for game/board, or None."""
+        self._submit(lambda db: db.execute(
+            "SELECT MAX(score) FROM scores WHERE game = ? AND board = ?", (game, board)).fetchone()[0],
+            callback)
+
+    def leaderboard(self, game, board="", limit=10, callback=None):
+        """`callback` gets up to `limit` (score, moves, seconds, created_at) rows, best first."""
+        self._submit(lambda db: db.execute(
+            "SELECT score, moves, seconds, created_at FROM scores WHERE game = ? AND board = ? "
+            "ORDER BY score DESC LIMIT ?", (game, board, limit)).fetchall(), callback)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Finish queued writes (waiting at most `timeout` s) and stop the worker; pending callbacks are dropped."""
+        if self.closed:
+            return
+        self.closed = True
+        atexit.unregister(self.close)
+        self.jobs.put(None)
+        self.worker.join(timeout)
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# Fonts are loaded once by key, rendered strings are memoized in a bounded
+# LRU cache so per-frame HUD text costs a dict lookup instead of a render.
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, key, size, name=None, bold=False, file=None):
+        """Load a font once under `key`. `file` is tried first, then SysFont(name)."""
+        font = None
+        if file:
+            try:
+                font = pygame.font.Font(file, size)
+            except (FileNotFoundError, OSError, pygame.error):
+                font = None
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        self.fonts[key] = font
+        return font
+
+    def font(self, key):
+        return self.fonts[key]
+
+    def render(self, key, text, color, antialias=True):
+        """Return a (cached) surface for `text` rendered with font `key`."""
+        cache_key = (key, text, color, antialias)
+        surface = self.surfaces.get(cache_key)
+        if surface is not None:
+            self.surfaces.move_to_end(cache_key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.fonts[key].render(text, antialias, color)
+        self.surfaces[cache_key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
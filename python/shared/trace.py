@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+from collections import deque
+from functools import wraps
+
+
+# Leveled event trace kept in a ring buffer instead of printed to stdout.
+# Off by default; enable with GAME_TRACE=debug|info|warning|error and
+# per-handler timing with GAME_TRACE_TIMING=1, which records durations at any
+# level. When a level is disabled a call is one comparison, and without
+# timing timed() returns the function unchanged.
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", OFF: "OFF"}
+
+
+class Tracer:
+    def __init__(self, name, level=OFF, size=2048, timing=False):
+        self.name = name
+        self.level = level
+        self.timing = timing
+        self.events = deque(maxlen=size)  # (monotonic time, level, event, fields)
+
+    def log(self, level, event, **fields):
+        if level < self.level:
+            return
+        self.events.append((time.monotonic(), level, event, fields))
+
+    def debug(self, event, **fields):
+        if self.level <= DEBUG:
+            self.events.append((time.monotonic(), DEBUG, event, fields))
+
+    def info(self, event, **fields):
+        if self.level <= INFO:
+            self.events.append((time.monotonic(), INFO, event, fields))
+
+    def warning(self, event, **fields):
+        if self.level <= WARNING:
+            self.events.append((time.monotonic(), WARNING, event, fields))
+
+    def error(self, event, **fields):
+        if self.level <= ERROR:
+            self.events.append((time.monotonic(), ERROR, event, fields))
+
+    def timed(self, func):
+        """Decorator recording a handler's duration (ms) as a DEBUG event when timing is on, whatever the level."""
+        if not self.timing:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.events.append((time.monotonic(), DEBUG, "timing", {
+                    "handler": func.__name__, "ms": round((time.perf_counter() - start) * 1000, 3)}))
+        return wrapper
+
+    def format(self):
+        lines = []
+        for stamp, level, event, fields in self.events:
+            details = " ".join(f"{key}={value!r}" for key, value in fields.items())
+            lines.append(f"{stamp:.3f} {LEVEL_NAMES.get(level, level)} {self.name}.{event} {details}".rstrip())
+        return lines
+
+    def dump(self, path=None):
+        """Write the buffered events to `path`, or stderr when no path is given."""
+        text = "\n".join(self.format()) + "\n"
+        if path is None:
+            sys.stderr.write(text)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(text)
+        return len(self.events)
+
+    def clear(self):
+        self.events.clear()
+
+
+_tracers = {}
+
+
+def get_tracer(name):
+    """Shared tracer per name, configured from GAME_TRACE / GAME_TRACE_TIMING."""
+    tracer = _tracers.get(name)
+    if tracer is None:
+        level_name = os.environ.get("GAME_TRACE", "off").upper()
+        level = next((value for value, key in LEVEL_NAMES.items() if key == level_name), OFF)
+        tracer = Tracer(name, level, timing=os.environ.get("GAME_TRACE_TIMING") == "1")
+        _tracers[name] = tracer
+    return tracer
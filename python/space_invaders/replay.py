@@ -0,0 +1,109 @@
+"""Replay a recorded Space Invaders run headless and check it for divergence.
+
+Usage: python replay.py RECORDING.json [--render] [--repeat 1]
+
+Recordings are written by the game when INVADERS_RECORD=path is set. A run
+is its seed plus one controls byte per frame, with a state checksum every
+CHECKSUM_EVERY frames; the replay stops at the first checksum that differs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+CHECKSUM_EVERY = 30
+FORMAT_VERSION = 1
+
+
+class Recording:
+    def __init__(self, seed, checksum_every=CHECKSUM_EVERY):
+        self.seed = seed
+        self.checksum_every = checksum_every
+        self.inputs = bytearray()  # Controls bitmask per frame
+        self.checksums = []  # State after every `checksum_every`th frame
+
+    def record(self, controls, checksum):
+        """Log one simulated frame; `checksum` is called on checkpoint frames only."""
+        self.inputs.append(controls)
+        if len(self.inputs) % self.checksum_every == 0:
+            self.checksums.append(checksum())
+
+    def save(self, path):
+        # Controls change rarely, so store them as [controls, frames] runs
+        runs = []
+        for controls in self.inputs:
+            if runs and runs[-1][0] == controls:
+                runs[-1][1] += 1
+            else:
+                runs.append([controls, 1])
+        with open(path, "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "seed": self.seed,
+                "checksum_every": self.checksum_every,
+                "inputs": runs,
+                "checksums": self.checksums,
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported recording version {data.get('version')}")
+        recording = cls(data["seed"], data["checksum_every"])
+        for controls, frames in data["inputs"]:
+            recording.inputs += bytes([controls]) * frames
+        recording.checksums = data["checksums"]
+        return recording
+
+
+def replay(game, recording, render=False):
+    """Re-simulate a recording as fast as possible; returns (frames run, first diverging frame or None)."""
+    import pygame
+    game.setup(recording.seed)
+    game.game_state = "playing"
+    every = recording.checksum_every
+    frame = 0
+    for frame, controls in enumerate(recording.inputs, 1):
+        game.update_playing(controls)
+        if render:
+            game.frame.fill(game.BLACK)
+            game.draw_playing()
+            game.present()
+            pygame.display.flip()
+        if frame % every == 0 and game.state_checksum() != recording.checksums[frame // every - 1]:
+            return frame, frame  # Diverged somewhere since the last checkpoint
+        if game.game_state != "playing":
+            break
+    return frame, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--render", action="store_true", help="draw every frame (still headless)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times, e.g. for profiling")
+    args = parser.parse_args()
+
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    import space_invaders as game
+    recording = Recording.load(args.recording)
+    game.init()
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        frames, diverged = replay(game, recording, args.render)
+        elapsed = time.perf_counter() - start
+        if diverged is not None:
+            print(f"Diverged: the checksum at frame {diverged} differs "
+                  f"(frame {diverged - recording.checksum_every} still matched)")
+            return 1
+        print(f"{frames} frames (seed {recording.seed}) in {elapsed * 1000:.0f} ms: "
+              f"{frames / elapsed:.0f} frames/s, {frames / game.FPS / elapsed:.0f}x real time, score {game.score}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
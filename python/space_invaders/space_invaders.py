@@ -4,15 +4,38 @@ import sys
 import asyncio
 import platform
 import os
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
-
-# Screen configuration
+import struct
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.text_cache import TextCache
+from shared.assets import AssetManager, show_loading_screen
+from shared.input_buffer import InputBuffer
+from shared.profiler import FrameProfiler
+from replay import Recording
+
+# Screen configuration; importing the module opens nothing, init() does.
+# The game plays in WIDTH x HEIGHT world units but is drawn into a fixed
+# RENDER_WIDTH x RENDER_HEIGHT frame (3/5 scale) that present() enlarges by a
+# whole number to fill the window: 3x on a 1080p screen, 6x on 4K. Drawing
+# cost stays the same at any monitor resolution; only the one scale grows.
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Space Invaders")
+RENDER_WIDTH, RENDER_HEIGHT = 480, 360
+FULLSCREEN = os.environ.get("INVADERS_FULLSCREEN") == "1"
+USE_SCALED = os.environ.get("INVADERS_SCALED") == "1"  # Let SDL scale on the GPU (pygame.SCALED) instead
+PRESENT_SCALE = int(os.environ.get("INVADERS_SCALE", 0))  # Window scale, 0 picks the largest that fits
+screen = None
+frame = None  # Render target for everything but the profiler overlay
+present_target = None  # Letterboxed area of the window the frame is scaled into
+present_scale = 1
+
+# Simulation: all randomness comes from `rng`, seeded by setup(), and each
+# frame's update only sees a bitmask of controls, so a seed plus the logged
+# controls replay a run exactly (see replay.py)
+GAME_SEED = os.environ.get("INVADERS_SEED")  # Fixed seed makes runs reproducible
+RECORD_PATH = os.environ.get("INVADERS_RECORD")  # Save each run's recording here
+LEFT, RIGHT, FIRE = 1, 2, 4
+rng = random.Random()
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,59 +44,63 @@ RED = (255, 0, 0)
 BLUE = (50, 50, 255)
 GREEN = (50, 255, 50)
 
-# Fonts
-font = pygame.font.SysFont("Arial", 36)
-title_font = pygame.font.SysFont("Arial", 48, bold=True)
+# Fonts (loaded once, rendered text is memoized)
+text_cache = TextCache()
+
+# Assets are resolved relative to this file and cached after the first load
+assets = AssetManager(os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets"))
+ASSET_MANIFEST = [
+    ("image", "player.png"),
+    ("image", "enemy.png"),
+    ("image", "bullet_player.png"),
+    ("image", "bullet_enemy.png"),
+    ("image", "hit_effect.png"),
+    ("sound", "shoot.wav"),
+    ("sound", "explosion.wav"),
+    ("sound", "hit.wav"),
+    ("sound", "game_over.wav"),
+    ("sound", "win.wav"),
+]
+
+def to_render(value):
+    """World units to render-frame pixels."""
+    return value * RENDER_HEIGHT // HEIGHT
+
+# Load images with fallback to surfaces (cached, so new sprites don't reload files).
+# `size` is in world units; the image is scaled once, to its size in the frame.
+def load_image(filename, size, fallback_color):
+    return assets.image(filename, (to_render(size[0]), to_render(size[1])), fallback_color)
 
-# Asset folder
-ASSET_PATH = "assets"
+# Sounds are filled in by load_audio() once the preload has finished
+shoot_sound = explosion_sound = hit_sound = game_over_sound = win_sound = None
 
-# Load images with fallback to surfaces
-def load_image(filename, size, fallback_color):
-    try:
-        path = os.path.join(ASSET_PATH, filename)
-        image = pygame.image.load(path).convert_alpha()
-        image = pygame.transform.scale(image, size)
-        return image
-    except (FileNotFoundError, pygame.error) as e:
-        print(f"Could not load {filename}: {e}. Using fallback surface.")
-        surface = pygame.Surface(size)
-        surface.fill(fallback_color)
-        return surface
-
-# Load sounds
-try:
-    shoot_sound = pygame.mixer.Sound(os.path.join(ASSET_PATH, "shoot.wav"))
-    explosion_sound = pygame.mixer.Sound(os.path.join(ASSET_PATH, "explosion.wav"))
-    hit_sound = pygame.mixer.Sound(os.path.join(ASSET_PATH, "hit.wav"))
-    game_over_sound = pygame.mixer.Sound(os.path.join(ASSET_PATH, "game_over.wav"))
-    win_sound = pygame.mixer.Sound(os.path.join(ASSET_PATH, "win.wav"))
-except FileNotFoundError:
-    print("Sound files not found. Running without some sounds.")
-    shoot_sound = explosion_sound = hit_sound = game_over_sound = win_sound = None
-
-# Load and play background music
-try:
-    pygame.mixer.music.load(os.path.join(ASSET_PATH, "background_music.mp3"))
-    pygame.mixer.music.set_volume(0.5)  # Adjust volume (0.0 to 1.0)
-    pygame.mixer.music.play(-1)  # Loop indefinitely
-except FileNotFoundError:
-    print("Background music file not found. Running without background music.")
+def load_audio():
+    global shoot_sound, explosion_sound, hit_sound, game_over_sound, win_sound
+    shoot_sound = assets.sound("shoot.wav")
+    explosion_sound = assets.sound("explosion.wav")
+    hit_sound = assets.sound("hit.wav")
+    game_over_sound = assets.sound("game_over.wav")
+    win_sound = assets.sound("win.wav")
+
+def start_music():
+    if assets.music("background_music.mp3", volume=0.5):
+        pygame.mixer.music.play(-1)  # Loop indefinitely
 
 # Player class
 class Player(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
         self.image = load_image("player.png", (50, 50), GREEN)
-        self.rect = self.image.get_rect(center=(WIDTH // 2, HEIGHT - 50))
+        self.rect = pygame.Rect(0, 0, 50, 50)
+        self.rect.center = (WIDTH // 2, HEIGHT - 50)
         self.speed = 5
         self.health = 3
+        self.controls = 0  # Set by update_playing() each frame
 
     def update(self):
-        keys = pygame.key.get_pressed()
-        if (keys[pygame.K_LEFT] or keys[pygame.K_a]) and self.rect.left > 0:
+        if self.controls & LEFT and self.rect.left > 0:
             self.rect.x -= self.speed
-        if (keys[pygame.K_RIGHT] or keys[pygame.K_d]) and self.rect.right < WIDTH:
+        if self.controls & RIGHT and self.rect.right < WIDTH:
             self.rect.x += self.speed
 
 # Enemy class
@@ -81,13 +108,13 @@ class Enemy(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
         self.image = load_image("enemy.png", (40, 40), RED)
-        self.rect = self.image.get_rect(topleft=(x, y))
+        self.rect = pygame.Rect(x, y, 40, 40)
         self.speed = 2
         self.direction = 1
 
     def update(self):
         self.rect.x += self.speed * self.direction
-        if random.random() < 0.01:  # Chance to shoot
+        if rng.random() < 0.01:  # Chance to shoot
             bullet = Bullet(self.rect.centerx, self.rect.bottom, 5, is_player=False)
             enemy_bullets.add(bullet)
             all_sprites.add(bullet)
@@ -99,7 +126,8 @@ class Bullet(pygame.sprite.Sprite):
         filename = "bullet_player.png" if is_player else "bullet_enemy.png"
         fallback_color = WHITE if is_player else RED
         self.image = load_image(filename, (5, 10), fallback_color)
-        self.rect = self.image.get_rect(center=(x, y))
+        self.rect = pygame.Rect(0, 0, 5, 10)
+        self.rect.center = (x, y)
         self.speed = speed
 
     def update(self):
@@ -112,7 +140,8 @@ class HitEffect(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
         self.image = load_image("hit_effect.png", (40, 40), WHITE)
-        self.rect = self.image.get_rect(center=(x, y))
+        self.rect = pygame.Rect(0, 0, 40, 40)
+        self.rect.center = (x, y)
         self.lifetime = 10  # Frames to display effect
         self.timer = 0
 
@@ -131,34 +160,50 @@ hit_effects = pygame.sprite.Group()
 # Initialize game variables
 player = None
 score = 0
+game_seed = None
+recording = None  # Controls and checksums of the current run
 game_state = "start"
 clock = pygame.time.Clock()
+assets_loaded = False
 FPS = 60
+inputs = InputBuffer()
+profiler = FrameProfiler("space_invaders")  # F3 overlay, F9 cProfile capture
 
-# Draw text function
+# Draw text function (world coordinates)
 def draw_text(text, x, y, color=WHITE, use_title_font=False):
-    selected_font = title_font if use_title_font else font
-    img = selected_font.render(text, True, color)
-    screen.blit(img, (x, y))
+    img = text_cache.render("title" if use_title_font else "text", text, color)
+    frame.blit(img, (to_render(x), to_render(y)))
+
+def mouse_position():
+    """Mouse position in frame pixels."""
+    x, y = pygame.mouse.get_pos()
+    if present_target is None:
+        return x, y  # pygame.SCALED maps it already
+    left, top = present_target.get_abs_offset()
+    return (x - left) // present_scale, (y - top) // present_scale
 
 # Draw button function
 def draw_button(text, x, y, width, height, inactive_color, active_color):
-    mouse = pygame.mouse.get_pos()
+    mouse = mouse_position()
     click = pygame.mouse.get_pressed()
     
-    button_rect = pygame.Rect(x, y, width, height)
+    button_rect = pygame.Rect(to_render(x), to_render(y), to_render(width), to_render(height))
     color = active_color if button_rect.collidepoint(mouse) else inactive_color
     
-    pygame.draw.rect(screen, color, button_rect, border_radius=10)
-    text_surface = font.render(text, True, WHITE)
+    pygame.draw.rect(frame, color, button_rect, border_radius=6)
+    text_surface = text_cache.render("text", text, WHITE)
     text_rect = text_surface.get_rect(center=button_rect.center)
-    screen.blit(text_surface, text_rect)
+    frame.blit(text_surface, text_rect)
     
     return button_rect.collidepoint(mouse) and click[0] == 1
 
 # Initialize game
-def setup():
-    global player, all_sprites, enemies, player_bullets, enemy_bullets, hit_effects, score
+def setup(seed=None):
+    global player, all_sprites, enemies, player_bullets, enemy_bullets, hit_effects, score, game_seed
+    if seed is None:
+        seed = int(GAME_SEED) if GAME_SEED else random.randrange(2 ** 32)
+    game_seed = seed
+    rng.seed(seed)
     all_sprites.empty()
     enemies.empty()
     player_bullets.empty()
@@ -182,25 +227,192 @@ def setup():
         except:
             pass
 
+# Shoot a bullet from the player
+def player_shoot():
+    bullet = Bullet(player.rect.centerx, player.rect.top, -7, is_player=True)
+    player_bullets.add(bullet)
+    all_sprites.add(bullet)
+    if shoot_sound:
+        shoot_sound.play()
+
+def read_controls():
+    """This frame's input as LEFT/RIGHT/FIRE bits; consumes the fire press."""
+    controls = 0
+    if inputs.is_held(pygame.K_LEFT) or inputs.is_held(pygame.K_a):
+        controls |= LEFT
+    if inputs.is_held(pygame.K_RIGHT) or inputs.is_held(pygame.K_d):
+        controls |= RIGHT
+    if inputs.consume(pygame.K_SPACE):
+        controls |= FIRE
+    return controls
+
+def state_checksum():
+    """CRC32 of everything carried from one frame to the next, RNG included."""
+    values = [score, player.health, *player.rect.topleft]
+    for group in (enemies, player_bullets, enemy_bullets, hit_effects):
+        values.append(len(group))
+        for sprite in group:
+            values += sprite.rect.topleft
+    values += [enemy.direction for enemy in enemies]
+    values += [effect.timer for effect in hit_effects]
+    crc = zlib.crc32(struct.pack(f"<{len(values)}i", *values))
+    rng_state = rng.getstate()[1]
+    return zlib.crc32(struct.pack(f"<{len(rng_state)}I", *rng_state), crc)
+
+# Advance one frame of the "playing" state
+def update_playing(controls):
+    global game_state, score
+    player.controls = controls
+    if controls & FIRE:
+        player_shoot()
+
+    all_sprites.update()
+    hit_effects.update()
+
+    # Enemy movement
+    if enemies:
+        leftmost = min(enemy.rect.left for enemy in enemies)
+        rightmost = max(enemy.rect.right for enemy in enemies)
+        if rightmost >= WIDTH or leftmost <= 0:
+            for enemy in enemies:
+                enemy.direction *= -1
+                enemy.rect.y += 20
+
+    profiler.mark("update")
+
+    # Handle collisions
+    for bullet in player_bullets:
+        hits = pygame.sprite.spritecollide(bullet, enemies, True)
+        if hits:
+            bullet.kill()
+            score += 10
+            if explosion_sound:
+                explosion_sound.play()
+            # Add hit effect
+            for hit in hits:
+                effect = HitEffect(hit.rect.centerx, hit.rect.centery)
+                hit_effects.add(effect)
+                all_sprites.add(effect)
+
+    for bullet in enemy_bullets:
+        if pygame.sprite.collide_rect(bullet, player):
+            bullet.kill()
+            player.health -= 1
+            if hit_sound:
+                hit_sound.play()
+            # Add hit effect
+            effect = HitEffect(player.rect.centerx, player.rect.centery)
+            hit_effects.add(effect)
+            all_sprites.add(effect)
+            if player.health <= 0:
+                if game_over_sound:
+                    pygame.mixer.music.stop()  # Stop background music
+                    game_over_sound.play()  # Play game over sound
+                game_state = "game_over"
+
+    # Check if enemies reach bottom
+    for enemy in enemies:
+        if enemy.rect.bottom >= HEIGHT:
+            if game_over_sound:
+                pygame.mixer.music.stop()  # Stop background music
+                game_over_sound.play()  # Play game over sound
+            game_state = "game_over"
+
+    # Check for win condition
+    if not enemies:  # If no enemies left
+        if win_sound:
+            pygame.mixer.music.stop()  # Stop background music
+            win_sound.play()  # Play win sound
+        game_state = "game_won"
+
+def draw_sprites(group):
+    frame.blits([(sprite.image, (to_render(sprite.rect.x), to_render(sprite.rect.y))) for sprite in group], False)
+
+# Draw one frame of the "playing" state
+def draw_playing():
+    draw_sprites(all_sprites)
+    draw_sprites(hit_effects)
+    draw_text(f"Score: {score}", 20, 20)
+    draw_text(f"Health: {player.health}", 20, 60)
+
+def open_display():
+    """Open the window and pick how the frame is presented in it."""
+    global screen, frame, present_target, present_scale
+    flags = pygame.FULLSCREEN if FULLSCREEN else 0
+    if USE_SCALED:
+        screen = frame = pygame.display.set_mode((RENDER_WIDTH, RENDER_HEIGHT), flags | pygame.SCALED)
+        present_target = None
+        return
+    if FULLSCREEN:
+        screen = pygame.display.set_mode((0, 0), flags)
+    else:
+        desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+        scale = PRESENT_SCALE or min(desktop_width // RENDER_WIDTH, desktop_height * 9 // 10 // RENDER_HEIGHT)
+        scale = max(1, scale)
+        screen = pygame.display.set_mode((RENDER_WIDTH * scale, RENDER_HEIGHT * scale))
+    width, height = screen.get_size()
+    present_scale = max(1, min(width // RENDER_WIDTH, height // RENDER_HEIGHT))
+    viewport = pygame.Rect(0, 0, RENDER_WIDTH * present_scale, RENDER_HEIGHT * present_scale)
+    viewport.center = screen.get_rect().center
+    screen.fill(BLACK)  # Letterbox bars
+    present_target = screen.subsurface(viewport)
+    if present_scale == 1:
+        frame = present_target  # Draw straight into the window, nothing to scale
+    else:
+        frame = pygame.Surface((RENDER_WIDTH, RENDER_HEIGHT)).convert()
+
+def present():
+    """Scale the frame into the window; the destination surface is reused every frame."""
+    if frame is not present_target and present_target is not None:
+        pygame.transform.scale(frame, present_target.get_size(), present_target)
+
 # Game loop
+def init():
+    """Open (or reuse) the window; fonts, images and sounds are loaded on the first call only."""
+    global assets_loaded
+    pygame.init()
+    pygame.mixer.init()
+    open_display()
+    pygame.display.set_caption("Space Invaders")
+    if assets_loaded:
+        return True
+    text_cache.load("text", to_render(36), name="Arial")
+    text_cache.load("title", to_render(48), name="Arial", bold=True)
+    # Decode images and sounds on a worker thread behind a loading screen
+    if not show_loading_screen(screen, assets, assets.preload(ASSET_MANIFEST), clock):
+        return False
+    load_audio()
+    assets_loaded = True
+    return True
+
+def finish_recording():
+    global recording
+    if recording and RECORD_PATH:
+        recording.save(RECORD_PATH)
+        print(f"Recorded {len(recording.inputs)} frames (seed {recording.seed}) to {RECORD_PATH}")
+    recording = None
+
 async def main():
-    global game_state, score
+    global game_state, recording
+    if not init():
+        return
+    start_music()
     setup()
+    game_state = "start"
+    inputs.clear()
+    overlay = None  # Profiler overlay rect on the window
     running = True
     
     while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if game_state == "playing" and event.key == pygame.K_SPACE:
-                    bullet = Bullet(player.rect.centerx, player.rect.top, -7, is_player=True)
-                    player_bullets.add(bullet)
-                    all_sprites.add(bullet)
-                    if shoot_sound:
-                        shoot_sound.play()
-
-        screen.fill(BLACK)
+        profiler.begin_frame()
+        inputs.poll()
+        if inputs.quit:
+            running = False
+        for event in inputs.frame_events:
+            profiler.handle_event(event)
+        profiler.mark("input")
+
+        frame.fill(BLACK)
 
         if game_state == "start":
             draw_text("Space Invaders", WIDTH // 2 - 140, HEIGHT // 3, WHITE, True)
@@ -222,80 +434,35 @@ async def main():
                 game_state = "playing"
         
         else:
-            # Update
-            all_sprites.update()
-            hit_effects.update()
-
-            # Enemy movement
-            if enemies:
-                leftmost = min(enemy.rect.left for enemy in enemies)
-                rightmost = max(enemy.rect.right for enemy in enemies)
-                if rightmost >= WIDTH or leftmost <= 0:
-                    for enemy in enemies:
-                        enemy.direction *= -1
-                        enemy.rect.y += 20
-
-            # Handle collisions
-            for bullet in player_bullets:
-                hits = pygame.sprite.spritecollide(bullet, enemies, True)
-                if hits:
-                    bullet.kill()
-                    score += 10
-                    if explosion_sound:
-                        explosion_sound.play()
-                    # Add hit effect
-                    for hit in hits:
-                        effect = HitEffect(hit.rect.centerx, hit.rect.centery)
-                        hit_effects.add(effect)
-                        all_sprites.add(effect)
-
-            for bullet in enemy_bullets:
-                if pygame.sprite.collide_rect(bullet, player):
-                    bullet.kill()
-                    player.health -= 1
-                    if hit_sound:
-                        hit_sound.play()
-                    # Add hit effect
-                    effect = HitEffect(player.rect.centerx, player.rect.centery)
-                    hit_effects.add(effect)
-                    all_sprites.add(effect)
-                    if player.health <= 0:
-                        if game_over_sound:
-                            pygame.mixer.music.stop()  # Stop background music
-                            game_over_sound.play()  # Play game over sound
-                        game_state = "game_over"
-
-            # Check if enemies reach bottom
-            for enemy in enemies:
-                if enemy.rect.bottom >= HEIGHT:
-                    if game_over_sound:
-                        pygame.mixer.music.stop()  # Stop background music
-                        game_over_sound.play()  # Play game over sound
-                    game_state = "game_over"
-
-            # Check for win condition
-            if not enemies:  # If no enemies left
-                if win_sound:
-                    pygame.mixer.music.stop()  # Stop background music
-                    win_sound.play()  # Play win sound
-                game_state = "game_won"
-
-            # Draw
-            all_sprites.draw(screen)
-            hit_effects.draw(screen)
-            draw_text(f"Score: {score}", 20, 20)
-            draw_text(f"Health: {player.health}", 20, 60)
-
+            if recording is None:
+                recording = Recording(game_seed)
+            controls = read_controls()
+            update_playing(controls)
+            recording.record(controls, state_checksum)
+            if game_state != "playing":
+                finish_recording()
+            profiler.mark("collide")
+            draw_playing()
+
+        profiler.mark("draw")
+        if overlay:
+            screen.fill(BLACK, overlay)  # The overlay may reach into the letterbox bars
+        present()
+        profiler.mark("present")
+        overlay = profiler.draw(screen)
         pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
         clock.tick(FPS)
         await asyncio.sleep(1.0 / FPS)
 
-    pygame.quit()
-    sys.exit()
+    finish_recording()
+    pygame.mixer.music.stop()
 
 # Run game
 if platform.system() == "Emscripten":
     asyncio.ensure_future(main())
 else:
     if __name__ == "__main__":
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(main())
+        pygame.quit()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import time
+
+# Delayed auto shift / auto repeat rate for held keys, run on a monotonic clock
+# rather than counted in frames: update(now) applies every move that fell due
+# since the last call, so the repeat rate doesn't depend on the frame rate.
+# A rate of 0 repeats instantly, i.e. slides until the move is blocked.
+LATENCY_BOUNDS_MS = [0.5, 1, 2, 4, 8, 1000 / 60, 1000 / 30]
+
+class LatencyHistogram:
+    def __init__(self, bounds=LATENCY_BOUNDS_MS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket is everything slower
+        self.total = 0
+        self.worst = 0.0
+
+    def record(self, ms):
+        index = 0
+        while index < len(self.bounds) and ms > self.bounds[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += 1
+        self.worst = max(self.worst, ms)
+
+    def fraction_within(self, ms):
+        """Share of samples known to be at or under `ms` (bucket bounds are inclusive)."""
+        if not self.total:
+            return 1.0
+        within = sum(count for bound, count in zip(self.bounds, self.counts) if bound <= ms)
+        return within / self.total
+
+    def format(self, name):
+        lines = [f"{name}: {self.total} samples, worst {self.worst:.2f} ms, "
+                 f"{self.fraction_within(1000 / 60):.1%} within one 60 FPS frame"]
+        lower = 0
+        for bound, count in zip(self.bounds + [float("inf")], self.counts):
+            label = f"<= {bound:.1f} ms" if bound != float("inf") else f">  {lower:.1f} ms"
+            lines.append(f"  {label:12} {count}")
+            lower = bound
+        return "\n".join(lines)
+
+class AutoRepeat:
+    """Tracks held actions; `apply(action)` performs one move and returns whether it happened."""
+
+    def __init__(self, apply, delays, rates, clock=time.perf_counter):
+        self.apply = apply
+        self.delays = delays  # action -> ms before repeating starts (0 for no delay)
+        self.rates = rates  # action -> ms between repeats, 0 slides until blocked
+        self.clock = clock
+        self.held = set()
+        self.due = {}  # active action -> clock time (s) its next move is due
+        self.repeating = set()  # held actions past their initial delay
+        self.sliding = set()  # held actions with rate 0 that already slid once
+        self.exclusive = {"left": "right", "right": "left"}  # Last pressed of a pair wins
+        self.latency = LatencyHistogram()
+        self.moves = 0  # Successful moves since the last update
+
+    def press(self, action, now):
+        """Register a key press at `now`; the first move is due immediately."""
+        self.held.add(action)
+        other = self.exclusive.get(action)
+        if other in self.due:
+            self.due.pop(other)
+            self.repeating.discard(other)
+            self.sliding.discard(other)
+        self.due[action] = now
+        self.repeating.discard(action)
+        self.sliding.discard(action)
+
+    def release(self, action, now):
+        self.held.discard(action)
+        self.due.pop(action, None)
+        self.repeating.discard(action)
+        self.sliding.discard(action)
+        other = self.exclusive.get(action)
+        if other in self.held and other not in self.due:
+            # The other direction takes over, starting from its delay
+            self.due[other] = now + self.delays[other] / 1000
+
+    def clear(self):
+        self.held.clear()
+        self.due.clear()
+        self.repeating.clear()
+        self.sliding.clear()
+
+    def update(self, now):
+        """Apply every move due by `now`; returns the number of moves made."""
+        self.moves = 0
+        for action in list(self.due):
+            due = self.due[action]
+            rate = self.rates[action] / 1000
+            while due <= now:
+                if action in self.repeating and rate == 0:
+                    moved = False
+                    while self.apply(action):
+                        self.moves += 1
+                        moved = True
+                    if moved and action not in self.sliding:
+                        self.latency.record((self.clock() - due) * 1000)
+                    self.sliding.add(action)
+                    due = now  # Keep sliding on later updates, e.g. after a rotation
+                    break
+                if self.apply(action):
+                    self.moves += 1
+                    self.latency.record((self.clock() - due) * 1000)
+                if action in self.repeating:
+                    due += rate
+                else:
+                    self.repeating.add(action)
+                    # A zero delay still waits one repeat, or a tap would move twice
+                    due += max(self.delays[action] / 1000, rate)
+            self.due[action] = due
+        return self.moves
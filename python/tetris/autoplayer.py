@@ -0,0 +1,292 @@
+import random
+
+# Lookahead autoplayer. Boards are kept as one bitmask per row (bit c is
+# column c) with a Zobrist hash that is updated as pieces lock and lines
+# clear, so searched positions can be cached in a bounded transposition table.
+LINE_WEIGHT = 0.76
+HEIGHT_WEIGHT = -0.51
+HOLE_WEIGHT = -0.36
+BUMPINESS_WEIGHT = -0.18
+MAX_PREVIEW = 8
+
+def rotate_shape(shape):
+    """Clockwise, same as rotate() in the game."""
+    rows = len(shape)
+    cols = len(shape[0])
+    rotated = [[0] * rows for _ in range(cols)]
+    for y in range(rows):
+        for x in range(cols):
+            rotated[x][rows - 1 - y] = shape[y][x]
+    return rotated
+
+def shape_cells(shape):
+    return [(y, x) for y, row in enumerate(shape) for x, value in enumerate(row) if value]
+
+# Random 64-bit keys per board cell, plus per (preview slot, piece id) keys
+# so a position's key also covers the pieces still to be placed
+class ZobristKeys:
+    def __init__(self, rows, cols, piece_count, seed=0):
+        rng = random.Random(seed)
+        self.cell = [[rng.getrandbits(64) for _ in range(cols)] for _ in range(rows)]
+        self.piece = [[rng.getrandbits(64) for _ in range(piece_count + 1)] for _ in range(MAX_PREVIEW + 1)]
+
+    def row(self, r, mask):
+        """XOR of the keys of the filled cells in row `r`."""
+        h = 0
+        keys = self.cell[r]
+        while mask:
+            low = mask & -mask
+            h ^= keys[low.bit_length() - 1]
+            mask ^= low
+        return h
+
+    def sequence(self, pieces):
+        h = 0
+        for slot, piece_id in enumerate(pieces):
+            h ^= self.piece[slot][piece_id]
+        return h
+
+class BoardState:
+    __slots__ = ("keys", "masks", "hash", "full")
+
+    def __init__(self, keys, masks, board_hash, full):
+        self.keys = keys
+        self.masks = masks
+        self.hash = board_hash
+        self.full = full
+
+    @classmethod
+    def empty(cls, keys, rows, cols):
+        return cls(keys, [0] * rows, 0, (1 << cols) - 1)
+
+    @classmethod
+    def from_board(cls, keys, board):
+        """Build from the game's board (rows of colors, 0 for empty)."""
+        state = cls.empty(keys, len(board), len(board[0]))
+        for r, row in enumerate(board):
+            mask = 0
+            for c, value in enumerate(row):
+                if value:
+                    mask |= 1 << c
+            state.masks[r] = mask
+            state.hash ^= keys.row(r, mask)
+        return state
+
+    def place(self, cells):
+        """New state with `cells` ((row, col) pairs) filled and full rows cleared; returns (state, lines)."""
+        rows = {}
+        for r, c in cells:
+            if r >= 0:
+                rows[r] = rows.get(r, 0) | 1 << c
+        return self.place_rows(rows.items())
+
+    def place_rows(self, piece_rows):
+        """Like place(), with the piece given as (row, mask) pairs."""
+        masks = self.masks[:]
+        h = self.hash
+        row_key = self.keys.row
+        for r, mask in piece_rows:
+            masks[r] |= mask
+            h ^= row_key(r, mask)
+        full = self.full
+        cleared = [r for r, _ in piece_rows if masks[r] == full]
+        if cleared:
+            # Every row above the lowest cleared one moves, so rehash that band
+            lowest = max(cleared)
+            for r in range(lowest + 1):
+                h ^= row_key(r, masks[r])
+            kept = [mask for mask in masks[:lowest + 1] if mask != full]
+            masks[:lowest + 1] = [0] * len(cleared) + kept
+            for r in range(lowest + 1):
+                if masks[r]:
+                    h ^= row_key(r, masks[r])
+        return BoardState(self.keys, masks, h, full), len(cleared)
+
+    def rise(self, lines, hole):
+        """New state pushed up by `lines` full rows open at column `hole`; returns (state, overflowed)."""
+        lines = min(lines, len(self.masks))
+        overflowed = any(self.masks[:lines])
+        masks = self.masks[lines:] + [self.full & ~(1 << hole)] * lines
+        h = 0
+        for r, mask in enumerate(masks):
+            if mask:
+                h ^= self.keys.row(r, mask)
+        return BoardState(self.keys, masks, h, self.full), overflowed
+
+    def top(self):
+        """Index of the highest non-empty row (len(masks) when the board is empty)."""
+        for r, mask in enumerate(self.masks):
+            if mask:
+                return r
+        return len(self.masks)
+
+    def evaluate(self, cols):
+        seen = 0
+        holes = 0
+        heights = [0] * cols
+        rows = len(self.masks)
+        for r, mask in enumerate(self.masks):
+            if not seen and not mask:
+                continue
+            holes += (seen & ~mask).bit_count()
+            new = mask & ~seen
+            while new:
+                low = new & -new
+                heights[low.bit_length() - 1] = rows - r
+                new ^= low
+            seen |= mask
+        bumpiness = sum(abs(heights[c] - heights[c + 1]) for c in range(cols - 1))
+        return HEIGHT_WEIGHT * sum(heights) + HOLE_WEIGHT * holes + BUMPINESS_WEIGHT * bumpiness
+
+# Fixed number of slots indexed by key, so memory stays bounded. A slot is
+# overwritten when it is empty, holds the same key, was written by an older
+# search, or holds a shallower result; otherwise the new entry is dropped.
+class TranspositionTable:
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.keys = [None] * size
+        self.depths = [0] * size
+        self.generations = [0] * size
+        self.values = [0.0] * size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejected = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key, depth):
+        self.probes += 1
+        slot = key % self.size
+        if self.keys[slot] == key and self.depths[slot] == depth:
+            self.hits += 1
+            return self.values[slot]
+        return None
+
+    def store(self, key, depth, value):
+        slot = key % self.size
+        existing = self.keys[slot]
+        if existing is not None and existing != key:
+            if self.generations[slot] == self.generation and self.depths[slot] > depth:
+                self.rejected += 1
+                return
+            self.replacements += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.generations[slot] = self.generation
+        self.values[slot] = value
+        self.stores += 1
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        filled = sum(1 for key in self.keys if key is not None)
+        return (f"transposition table: {self.hits}/{self.probes} hits ({self.hit_rate:.1%}), "
+                f"{self.stores} stores, {self.replacements} replaced, {self.rejected} rejected, "
+                f"{filled}/{self.size} slots used")
+
+# Picks a placement for the current piece by searching the next pieces too.
+# Each level only expands the `beam` best placements by the static evaluation.
+class AutoPlayer:
+    def __init__(self, rows, cols, shapes, depth=3, beam=5, table_size=1 << 16, seed=0):
+        self.rows = rows
+        self.cols = cols
+        self.depth = depth
+        self.beam = beam
+        self.keys = ZobristKeys(rows, cols, len(shapes) - 1, seed)
+        self.table = TranspositionTable(table_size)
+        self.placements = {piece_id: self._placements(shape) for piece_id, shape in enumerate(shapes) if shape}
+
+    def _placements(self, shape):
+        """(rotations, x, rows) for each distinct rotation and column; rows are (y, mask) pairs."""
+        result = []
+        seen = set()
+        for rotations in range(4):
+            cells = shape_cells(shape)
+            normalized = frozenset((y - min(cy for cy, _ in cells), x - min(cx for _, cx in cells)) for y, x in cells)
+            if normalized not in seen:
+                seen.add(normalized)
+                left = min(x for _, x in cells)
+                right = max(x for _, x in cells)
+                for x in range(-left, self.cols - right):
+                    rows = {}
+                    for cy, cx in cells:
+                        rows[cy] = rows.get(cy, 0) | 1 << (cx + x)
+                    result.append((rotations, x, sorted(rows.items())))
+            shape = rotate_shape(shape)
+        return result
+
+    def empty_state(self):
+        return BoardState.empty(self.keys, self.rows, self.cols)
+
+    def _drop(self, state, piece_rows, top):
+        """(row, mask) pairs of the piece dropped straight down from the top, or None if it doesn't fit."""
+        masks = state.masks
+        rows = self.rows
+
+        def fits(dy):
+            for y, mask in piece_rows:
+                r = y + dy
+                if r >= rows or masks[r] & mask:
+                    return False
+            return True
+
+        # Rows above `top` are empty, so the piece falls freely until it reaches them
+        dy = max(0, top - piece_rows[-1][0] - 1)
+        if not dy and not fits(0):
+            return None
+        while fits(dy + 1):
+            dy += 1
+        return [(y + dy, mask) for y, mask in piece_rows]
+
+    def _evaluate(self, state):
+        value = self.table.probe(state.hash, 0)
+        if value is None:
+            value = state.evaluate(self.cols)
+            self.table.store(state.hash, 0, value)
+        return value
+
+    def _children(self, state, piece_id):
+        children = []
+        top = state.top()
+        for rotations, x, piece_rows in self.placements[piece_id]:
+            dropped = self._drop(state, piece_rows, top)
+            if dropped is None:
+                continue
+            child, lines = state.place_rows(dropped)
+            reward = LINE_WEIGHT * lines
+            children.append((reward + self._evaluate(child), reward, child, rotations, x))
+        children.sort(key=lambda child: child[0], reverse=True)
+        return children
+
+    def _search(self, state, pieces):
+        key = state.hash ^ self.keys.sequence(pieces)
+        value = self.table.probe(key, len(pieces))
+        if value is not None:
+            return value
+        children = self._children(state, pieces[0])
+        if not children:
+            value = float("-inf")
+        elif len(pieces) == 1:
+            value = children[0][0]
+        else:
+            value = max(reward + self._search(child, pieces[1:]) for _, reward, child, _, _ in children[:self.beam])
+        self.table.store(key, len(pieces), value)
+        return value
+
+    def best_move(self, state, pieces):
+        """(rotations, x) for pieces[0], looking ahead through up to `depth` pieces."""
+        pieces = list(pieces)[:self.depth]
+        self.table.new_search()
+        children = self._children(state, pieces[0])
+        if not children:
+            return None
+        if len(pieces) == 1:
+            return children[0][3], children[0][4]
+        best = max(children[:self.beam], key=lambda child: child[1] + self._search(child[2], pieces[1:]))
+        return best[3], best[4]
@@ -1,22 +1,40 @@
 import pygame
 import random
 import sys
-
-# Initialize Pygame and Mixer
-pygame.init()
-pygame.mixer.init()  # Initialize audio mixer
-
-# Game settings
+import os
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.text_cache import TextCache
+from shared.assets import AssetManager, show_loading_screen
+from shared.profiler import FrameProfiler
+from auto_repeat import AutoRepeat, LatencyHistogram
+from autoplayer import AutoPlayer
+
+# Game settings; the board size can be changed with configure_board()
 ROWS = 20
 COLS = 10
+MAX_ROWS = 1000
+MAX_COLS = 200
 BLOCK_SIZE = 30
 NEXT_BLOCK_SIZE = 25
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-BOARD_WIDTH = COLS * BLOCK_SIZE
-BOARD_HEIGHT = ROWS * BLOCK_SIZE
-BOARD_X = (WINDOW_WIDTH - BOARD_WIDTH) // 2
-BOARD_Y = (WINDOW_HEIGHT - BOARD_HEIGHT) // 2
+VIEW_MAX_WIDTH = 500  # Board viewport, left of the side panel
+SIDE_X = 600  # Next piece and HUD
+ZOOM_LEVELS = [2, 3, 5, 8, 12, 18, 24, BLOCK_SIZE]  # Cell sizes in pixels
+
+# Held-key repeat: LEFT/RIGHT wait DAS_MS, then repeat every ARR_MS (0 slides
+# to the wall at once); DOWN soft-drops every SOFT_DROP_MS
+DAS_MS = int(os.environ.get("TETRIS_DAS_MS", 170))
+ARR_MS = int(os.environ.get("TETRIS_ARR_MS", 50))
+SOFT_DROP_MS = int(os.environ.get("TETRIS_SOFT_DROP_MS", 50))
+
+# Pieces dealt ahead of next_piece, for the autoplayer (A toggles it) to
+# look AUTOPLAY_DEPTH pieces deep
+PREVIEW_SIZE = 3
+AUTOPLAY_DEPTH = int(os.environ.get("TETRIS_AUTOPLAY_DEPTH", 3))
 
 # Colors
 BLACK = (0, 0, 0)
@@ -55,53 +73,177 @@ SHAPES = [
     [[7, 7, 0], [0, 7, 7], [0, 0, 0]]                           # Z
 ]
 
-# Fonts
-try:
-    FONT = pygame.font.Font("pressstart2p.ttf", 36)
-    SMALL_FONT = pygame.font.Font("pressstart2p.ttf", 20)
-except:
-    FONT = pygame.font.SysFont("monospace", 36)
-    SMALL_FONT = pygame.font.SysFont("monospace", 20)
-
-# Load sound effects
-try:
-    line_clear_sound = pygame.mixer.Sound("line_clear.wav")
-except:
-    line_clear_sound = None
-    print("Warning: 'line_clear.wav' not found. Line clear sound disabled.")
-try:
-    game_over_sound = pygame.mixer.Sound("game_over.wav")
-except:
-    game_over_sound = None
-    print("Warning: 'game_over.wav' not found. Game over sound disabled.")
-try:
-    rotate_sound = pygame.mixer.Sound("rotate.wav")
-except:
-    rotate_sound = None
-    print("Warning: 'rotate.wav' not found. Rotate sound disabled.")
-try:
-    move_sound = pygame.mixer.Sound("move.wav")
-except:
-    move_sound = None
-    print("Warning: 'move.wav' not found. Move sound disabled.")
-try:
-    hard_drop_sound = pygame.mixer.Sound("hard_drop.wav")
-except:
-    hard_drop_sound = None
-    print("Warning: 'hard_drop.wav' not found. Hard drop sound disabled.")
-try:
-    level_up_sound = pygame.mixer.Sound("level_up.wav")
-except:
-    level_up_sound = None
-    print("Warning: 'level_up.wav' not found. Level up sound disabled.")
-
-# Load and play background music
-try:
-    pygame.mixer.music.load("bgm.mp3")
-    pygame.mixer.music.set_volume(0.5)  # Lower volume for background music
-    pygame.mixer.music.play(-1)  # Loop indefinitely
-except:
-    print("Warning: 'bgm.mp3' not found. Background music disabled.")
+# Fonts (loaded once, rendered text is memoized)
+FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pressstart2p.ttf")
+text_cache = TextCache()
+
+# Sounds are resolved relative to this file and decoded on a worker thread
+# behind a loading screen (see below); until then they stay None
+assets = AssetManager(os.path.dirname(os.path.abspath(__file__)))
+ASSET_MANIFEST = [
+    ("sound", "line_clear.wav"),
+    ("sound", "game_over.wav"),
+    ("sound", "rotate.wav"),
+    ("sound", "move.wav"),
+    ("sound", "hard_drop.wav"),
+    ("sound", "level_up.wav"),
+]
+line_clear_sound = game_over_sound = rotate_sound = move_sound = hard_drop_sound = level_up_sound = None
+
+def load_audio():
+    global line_clear_sound, game_over_sound, rotate_sound, move_sound, hard_drop_sound, level_up_sound
+    line_clear_sound = assets.sound("line_clear.wav")
+    game_over_sound = assets.sound("game_over.wav")
+    rotate_sound = assets.sound("rotate.wav")
+    move_sound = assets.sound("move.wav")
+    hard_drop_sound = assets.sound("hard_drop.wav")
+    level_up_sound = assets.sound("level_up.wav")
+
+def start_music():
+    if assets.music("bgm.mp3", volume=0.5):  # Lower volume for background music
+        pygame.mixer.music.play(-1)  # Loop indefinitely
+
+# Camera over the board plus a cached layer of the locked cells it shows.
+# Only cells marked dirty are redrawn; scrolling and line clears move the
+# layer's pixels instead of redrawing them.
+class BoardView:
+    def __init__(self):
+        self.cell = BLOCK_SIZE
+        self.top = 0  # First visible row and column
+        self.left = 0
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.layer = None
+        self.dirty = set()  # (row, col) changed since the last draw
+        self.full_redraw = True
+        self.layout()
+
+    @property
+    def visible_rows(self):
+        return min(ROWS, WINDOW_HEIGHT // self.cell)
+
+    @property
+    def visible_cols(self):
+        return min(COLS, VIEW_MAX_WIDTH // self.cell)
+
+    def layout(self):
+        width = self.visible_cols * self.cell
+        height = self.visible_rows * self.cell
+        x = min((WINDOW_WIDTH - width) // 2, SIDE_X - 50 - width)
+        self.rect = pygame.Rect(x, (WINDOW_HEIGHT - height) // 2, width, height)
+        self.top = max(0, min(self.top, ROWS - self.visible_rows))
+        self.left = max(0, min(self.left, COLS - self.visible_cols))
+        self.layer = None
+        self.full_redraw = True
+
+    def fit(self):
+        """Largest zoom level that shows the full board width."""
+        fitting = [size for size in ZOOM_LEVELS if size * COLS <= VIEW_MAX_WIDTH]
+        self.cell = fitting[-1] if fitting else ZOOM_LEVELS[0]
+        self.top = self.left = 0
+        self.layout()
+
+    def zoom(self, step):
+        index = ZOOM_LEVELS.index(self.cell) + step
+        if 0 <= index < len(ZOOM_LEVELS):
+            self.cell = ZOOM_LEVELS[index]
+            self.layout()
+
+    def to_screen(self, row, col):
+        return self.rect.x + (col - self.left) * self.cell, self.rect.y + (row - self.top) * self.cell
+
+    def is_visible(self, row, col):
+        return self.top <= row < self.top + self.visible_rows and self.left <= col < self.left + self.visible_cols
+
+    def follow(self, piece):
+        """Scroll just enough to keep the piece (plus a margin) in view."""
+        rows, cols = self.visible_rows, self.visible_cols
+        x, y = piece["pos"]["x"], piece["pos"]["y"]
+        size = len(piece["shape"])
+        margin_rows, margin_cols = min(4, rows // 4), min(4, cols // 4)
+        top, left = self.top, self.left
+        top = min(top, y - margin_rows)
+        top = max(top, y + size + margin_rows - rows)
+        left = min(left, x - margin_cols)
+        left = max(left, x + size + margin_cols - cols)
+        self.scroll_to(max(0, min(top, ROWS - rows)), max(0, min(left, COLS - cols)))
+
+    def scroll_to(self, top, left):
+        drow, dcol = top - self.top, left - self.left
+        if not drow and not dcol:
+            return
+        if self.layer is None or self.full_redraw or abs(drow) >= self.visible_rows or abs(dcol) >= self.visible_cols:
+            self.top, self.left = top, left
+            self.full_redraw = True
+            return
+        self.flush()
+        self.top, self.left = top, left
+        self.layer.scroll(-dcol * self.cell, -drow * self.cell)
+        # Redraw the strips that scrolled into view
+        rows = range(self.top, self.top + self.visible_rows)
+        cols = range(self.left, self.left + self.visible_cols)
+        new_rows = rows[-drow:] if drow > 0 else rows[:-drow]
+        new_cols = cols[-dcol:] if dcol > 0 else cols[:-dcol]
+        self.dirty.update((row, col) for row in new_rows for col in cols)
+        self.dirty.update((row, col) for row in rows for col in new_cols)
+
+    def mark(self, row, col):
+        if self.is_visible(row, col):
+            self.dirty.add((row, col))
+
+    def rows_cleared(self, cleared):
+        """Shift the layer for rows removed from the board, top to bottom; flush() first."""
+        if self.layer is None or self.full_redraw:
+            return
+        bottom = self.top + self.visible_rows
+        shifted = 0
+        for row in sorted(cleared):
+            if row < self.top:
+                continue  # Nothing in view moves
+            band_rows = min(row, bottom - 1) - self.top + 1
+            band = self.layer.subsurface((0, 0, self.rect.width, band_rows * self.cell))
+            band.scroll(0, self.cell)
+            shifted += 1
+        # Rows that came down into view from above
+        for row in range(self.top, min(self.top + shifted, bottom)):
+            self.dirty.update((row, col) for col in range(self.left, self.left + self.visible_cols))
+
+    def draw_cell(self, row, col):
+        rect = ((col - self.left) * self.cell, (row - self.top) * self.cell, self.cell, self.cell)
+        color = board[row][col]
+        self.layer.fill(color if color else (0, 0, 0, 0), rect)
+        if self.cell >= 5:
+            pygame.draw.rect(self.layer, BLACK, rect, 1)
+
+    def flush(self):
+        """Bring the layer up to date with the board."""
+        if self.layer is None:
+            self.layer = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.full_redraw = True
+        if self.full_redraw:
+            self.layer.fill((0, 0, 0, 0))
+            for row in range(self.top, self.top + self.visible_rows):
+                for col in range(self.left, self.left + self.visible_cols):
+                    self.draw_cell(row, col)
+            self.full_redraw = False
+        else:
+            for row, col in self.dirty:
+                if self.is_visible(row, col):
+                    self.draw_cell(row, col)
+        self.dirty.clear()
+
+    def draw(self, surface, piece):
+        self.flush()
+        surface.blit(self.layer, self.rect)
+        if piece:
+            for y, row in enumerate(piece["shape"]):
+                for x, value in enumerate(row):
+                    if value and self.is_visible(piece["pos"]["y"] + y, piece["pos"]["x"] + x):
+                        screen_x, screen_y = self.to_screen(piece["pos"]["y"] + y, piece["pos"]["x"] + x)
+                        cell = (screen_x, screen_y, self.cell, self.cell)
+                        pygame.draw.rect(surface, piece["color"], cell)
+                        if self.cell >= 5:
+                            pygame.draw.rect(surface, BLACK, cell, 1)
+        pygame.draw.rect(surface, GRAY, self.rect.inflate(4, 4), 2)
 
 # Particle system for explosion effect
 particles = []
@@ -132,21 +274,42 @@ class Particle:
 
 # Game state
 board = [[0] * COLS for _ in range(ROWS)]
+row_fill = [0] * ROWS  # Filled cells per row, so full rows are found without scanning
+view = BoardView()
 score = 0
 level = 1
 game_over = False
 is_paused = False
 current_piece = None
 next_piece = None
+piece_queue = deque()  # Dealt after next_piece
+board_state = None  # Bitmask copy of the board with its Zobrist hash, for the autoplayer
+autoplay = os.environ.get("TETRIS_AUTOPLAY") == "1"
+autoplay_plan = None  # [piece, rotations left, target x]
+on_lock = None  # Called as on_lock(piece, lines) after each lock, before the next piece spawns
 drop_time = 0
 title_scale = 1.0
 title_pulse = 0.02  # For title animation
 game_over_sound_played = False
+move_sound_pending = False
 
-# Screen setup
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Tetris")
+# Screen setup; importing the module opens nothing, init() does
+screen = None
 clock = pygame.time.Clock()
+assets_loaded = False
+profiler = FrameProfiler("tetris")  # F3 overlay, F9 cProfile capture
+
+autoplayer = AutoPlayer(ROWS, COLS, SHAPES, depth=AUTOPLAY_DEPTH)
+background = None  # Gradient, rendered once by init()
+
+def configure_board(rows, cols):
+    """Set the board size for the next game, e.g. 1000 x 200 for endurance play."""
+    global ROWS, COLS, autoplayer
+    if not (4 <= rows <= MAX_ROWS and 4 <= cols <= MAX_COLS):
+        raise ValueError(f"board must be 4-{MAX_ROWS} rows by 4-{MAX_COLS} columns, got {rows}x{cols}")
+    ROWS, COLS = rows, cols
+    autoplayer = AutoPlayer(ROWS, COLS, SHAPES, depth=AUTOPLAY_DEPTH)
+    view.fit()
 
 def create_board():
     return [[0] * COLS for _ in range(ROWS)]
@@ -157,16 +320,22 @@ def get_random_piece():
         "shape": SHAPES[piece_id],
         "color": COLORS[piece_id],
         "pos": {"x": COLS // 2 - 1, "y": 0},
-        "id": piece_id
+        "id": piece_id,
+        "rotation": 0  # Clockwise quarter turns from SHAPES[id]
     }
 
-def draw_gradient_background():
+def render_gradient_background():
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
     for y in range(WINDOW_HEIGHT):
         t = y / WINDOW_HEIGHT
         r = int(DARK_BLUE[0] * (1 - t) + BLACK[0] * t)
         g = int(DARK_BLUE[1] * (1 - t) + BLACK[1] * t)
         b = int(DARK_BLUE[2] * (1 - t) + BLACK[2] * t)
-        pygame.draw.line(screen, (r, g, b), (0, y), (WINDOW_WIDTH, y))
+        pygame.draw.line(surface, (r, g, b), (0, y), (WINDOW_WIDTH, y))
+    return surface
+
+def draw_gradient_background():
+    screen.blit(background, (0, 0))
 
 def draw_block(surface, x, y, color, block_size, is_board=False):
     pygame.draw.rect(surface, color, (x * block_size, y * block_size, block_size, block_size))
@@ -177,23 +346,9 @@ def draw_block(surface, x, y, color, block_size, is_board=False):
 
 def draw_board():
     draw_gradient_background()
-    board_surface = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT), pygame.SRCALPHA)
-    for y in range(ROWS):
-        for x in range(COLS):
-            if board[y][x]:
-                draw_block(board_surface, x, y, board[y][x], BLOCK_SIZE, is_board=True)
-            else:
-                draw_block(board_surface, x, y, (0, 0, 0, 0), BLOCK_SIZE, is_board=True)
-    
     if current_piece:
-        for y, row in enumerate(current_piece["shape"]):
-            for x, value in enumerate(row):
-                if value:
-                    draw_block(board_surface, current_piece["pos"]["x"] + x,
-                              current_piece["pos"]["y"] + y,
-                              current_piece["color"], BLOCK_SIZE)
-    screen.blit(board_surface, (BOARD_X, BOARD_Y))
-    pygame.draw.rect(screen, GRAY, (BOARD_X - 2, BOARD_Y - 2, BOARD_WIDTH + 4, BOARD_HEIGHT + 4), 2)
+        view.follow(current_piece)
+    view.draw(screen, current_piece)
 
 def draw_next_piece():
     next_surface = pygame.Surface((120, 120), pygame.SRCALPHA)
@@ -204,7 +359,7 @@ def draw_next_piece():
                 if value:
                     draw_block(next_surface, x, y, next_piece["color"], NEXT_BLOCK_SIZE)
     pygame.draw.rect(next_surface, GRAY, (0, 0, 120, 120), 2)
-    screen.blit(next_surface, (BOARD_X + BOARD_WIDTH + 50, BOARD_Y + 50))
+    screen.blit(next_surface, (SIDE_X, view.rect.y + 50))
 
 def is_valid_position(piece, offset={"x": 0, "y": 0}):
     for y, row in enumerate(piece["shape"]):
@@ -237,66 +392,101 @@ def rotate():
             current_piece["shape"] = original_shape
             current_piece["pos"] = original_pos
             return
+    current_piece["rotation"] = (current_piece["rotation"] + 1) % 4
     if rotate_sound:
         rotate_sound.play()
 
+# Moves only flag the move sound; update_game() plays it at most once a frame
 def move_left():
+    global move_sound_pending
     if not current_piece or game_over or is_paused:
-        return
+        return False
     if is_valid_position(current_piece, {"x": -1, "y": 0}):
         current_piece["pos"]["x"] -= 1
-        if move_sound:
-            move_sound.play()
+        move_sound_pending = True
+        return True
+    return False
 
 def move_right():
+    global move_sound_pending
     if not current_piece or game_over or is_paused:
-        return
+        return False
     if is_valid_position(current_piece, {"x": 1, "y": 0}):
         current_piece["pos"]["x"] += 1
-        if move_sound:
-            move_sound.play()
+        move_sound_pending = True
+        return True
+    return False
 
 def move_down():
+    global move_sound_pending
     if not current_piece or game_over or is_paused:
         return False
     if is_valid_position(current_piece, {"x": 0, "y": 1}):
         current_piece["pos"]["y"] += 1
-        if move_sound:
-            move_sound.play()
+        move_sound_pending = True
         return True
     return False
 
 def hard_drop():
+    global move_sound_pending
     if not current_piece or game_over or is_paused:
         return
     while move_down():
         pass
     lock_piece()
+    move_sound_pending = False  # The drop has its own sound
     if hard_drop_sound:
         hard_drop_sound.play()
 
+MOVES = {"left": move_left, "right": move_right, "down": move_down}
+REPEAT_KEYS = {pygame.K_LEFT: "left", pygame.K_RIGHT: "right", pygame.K_DOWN: "down"}
+auto_repeat = AutoRepeat(
+    lambda action: MOVES[action](),
+    delays={"left": DAS_MS, "right": DAS_MS, "down": 0},
+    rates={"left": ARR_MS, "right": ARR_MS, "down": SOFT_DROP_MS},
+)
+# Time a key press can have waited in the event queue: pygame doesn't expose
+# the SDL event timestamp, so this is the time since the previous poll, an
+# upper bound. Kept apart from the input-to-state latency and the DAS schedule.
+queue_wait = LatencyHistogram()
+
 def spawn_explosion(y):
-    for x in range(COLS):
+    if not view.top <= y < view.top + view.visible_rows:
+        return
+    step = max(1, view.visible_cols // 10)  # About ten bursts across wide boards
+    for x in range(view.left, view.left + view.visible_cols, step):
         color = board[y][x] if board[y][x] else WHITE
+        screen_x, screen_y = view.to_screen(y, x)
         for _ in range(5):
-            px = BOARD_X + x * BLOCK_SIZE + BLOCK_SIZE / 2
-            py = BOARD_Y + y * BLOCK_SIZE + BLOCK_SIZE / 2
-            particles.append(Particle(px, py, color))
+            particles.append(Particle(screen_x + view.cell / 2, screen_y + view.cell / 2, color))
+
+def deal_piece():
+    global next_piece
+    piece = next_piece
+    next_piece = piece_queue.popleft()
+    piece_queue.append(get_random_piece())
+    return piece
 
 def lock_piece():
-    global current_piece, next_piece, game_over, game_over_sound_played
+    global current_piece, game_over, game_over_sound_played, board_state
+    cells = []
     for y, row in enumerate(current_piece["shape"]):
         for x, value in enumerate(row):
             if value:
                 board_y = current_piece["pos"]["y"] + y
                 if board_y >= 0:
                     board[board_y][current_piece["pos"]["x"] + x] = current_piece["color"]
-    lines = check_lines()
+                    row_fill[board_y] += 1
+                    view.mark(board_y, current_piece["pos"]["x"] + x)
+                    cells.append((board_y, current_piece["pos"]["x"] + x))
+    board_state, _ = board_state.place(cells)  # Updates the hash, clears the same lines
+    lines = check_lines({row for row, _ in cells})
     if lines > 0:
         add_score(lines)
-    current_piece = next_piece
-    next_piece = get_random_piece()
-    if not is_valid_position(current_piece):
+    if on_lock:
+        on_lock(current_piece, lines)
+    current_piece = deal_piece()
+    if game_over or not is_valid_position(current_piece):
         game_over = True
         if not game_over_sound_played and game_over_sound:
             game_over_sound.play()
@@ -304,20 +494,36 @@ def lock_piece():
     global drop_time
     drop_time = pygame.time.get_ticks()
 
-def check_lines():
-    lines = 0
-    y = ROWS - 1
-    while y >= 0:
-        if all(board[y]):
-            spawn_explosion(y)
-            board.pop(y)
-            board.insert(0, [0] * COLS)
-            lines += 1
-            if line_clear_sound:
-                line_clear_sound.play()
-        else:
-            y -= 1
-    return lines
+def check_lines(rows):
+    """Clear the full rows among `rows` (the ones the last piece touched)."""
+    full = sorted(y for y in rows if row_fill[y] == COLS)
+    if full:
+        view.flush()  # Draw the locked piece before the layer is shifted
+    # Top to bottom: removing a row leaves the indices of the rows below it unchanged
+    for y in full:
+        spawn_explosion(y)
+        board.pop(y)
+        board.insert(0, [0] * COLS)
+        row_fill.pop(y)
+        row_fill.insert(0, 0)
+        if line_clear_sound:
+            line_clear_sound.play()
+    view.rows_cleared(full)
+    return len(full)
+
+def add_garbage(lines, hole):
+    """Push the stack up by `lines` gray rows that are open at column `hole`."""
+    global board_state, game_over
+    lines = min(lines, ROWS)
+    if any(row_fill[:lines]):
+        game_over = True  # Blocks were pushed out of the top
+    del board[:lines]
+    del row_fill[:lines]
+    for _ in range(lines):
+        board.append([0 if col == hole else GRAY for col in range(COLS)])
+        row_fill.append(COLS - 1)
+    board_state, _ = board_state.rise(lines, hole)
+    view.full_redraw = True
 
 def add_score(lines):
     global score, level
@@ -335,7 +541,7 @@ def draw_start_screen():
     title_scale += title_pulse
     if title_scale > 1.1 or title_scale < 0.9:
         title_pulse = -title_pulse
-    title = FONT.render("TETRIS", True, CYAN)
+    title = text_cache.render("large", "TETRIS", CYAN)
     scaled_title = pygame.transform.scale(title, (int(title.get_width() * title_scale), int(title.get_height() * title_scale)))
     screen.blit(scaled_title, (WINDOW_WIDTH // 2 - scaled_title.get_width() // 2, 100))
     block_grid = [
@@ -347,7 +553,7 @@ def draw_start_screen():
     for y, row in enumerate(block_grid):
         for x, color in enumerate(row):
             draw_block(screen, WINDOW_WIDTH // 2 // BLOCK_SIZE - 2 + x, 200 // BLOCK_SIZE + y, color, BLOCK_SIZE)
-    play_text = SMALL_FONT.render("Press SPACE to PLAY", True, WHITE)
+    play_text = text_cache.render("small", "Press SPACE to PLAY", WHITE)
     screen.blit(play_text, (WINDOW_WIDTH // 2 - play_text.get_width() // 2, 300))
     controls = [
         "Controls:",
@@ -355,19 +561,21 @@ def draw_start_screen():
         "↑ : Rotate",
         "↓ : Soft Drop",
         "Space : Hard Drop",
-        "P : Pause/Resume"
+        "P : Pause/Resume",
+        "A : Autoplay",
+        "+ - : Zoom"
     ]
     for i, line in enumerate(controls):
-        text = SMALL_FONT.render(line, True, GRAY)
+        text = text_cache.render("small", line, GRAY)
         screen.blit(text, (WINDOW_WIDTH // 2 - text.get_width() // 2, 400 + i * 25))
 
 def draw_game_over():
     overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
     overlay.fill((0, 0, 0, 180))
     screen.blit(overlay, (0, 0))
-    game_over_text = FONT.render("GAME OVER", True, RED)
-    score_text = SMALL_FONT.render(f"Score: {score}", True, WHITE)
-    restart_text = SMALL_FONT.render("Press R to Restart", True, WHITE)
+    game_over_text = text_cache.render("large", "GAME OVER", RED)
+    score_text = text_cache.render("small", f"Score: {score}", WHITE)
+    restart_text = text_cache.render("small", "Press R to Restart", WHITE)
     screen.blit(game_over_text, (WINDOW_WIDTH // 2 - game_over_text.get_width() // 2, 200))
     screen.blit(score_text, (WINDOW_WIDTH // 2 - score_text.get_width() // 2, 300))
     screen.blit(restart_text, (WINDOW_WIDTH // 2 - restart_text.get_width() // 2, 350))
@@ -376,13 +584,16 @@ def draw_hud():
     hud_surface = pygame.Surface((200, 200), pygame.SRCALPHA)
     hud_surface.fill((50, 50, 50, 200))
     pygame.draw.rect(hud_surface, GRAY, (0, 0, 200, 200), 2)
-    score_text = SMALL_FONT.render(f"SCORE: {score}", True, WHITE)
-    level_text = SMALL_FONT.render(f"LEVEL: {level}", True, WHITE)
+    score_text = text_cache.render("small", f"SCORE: {score}", WHITE)
+    level_text = text_cache.render("small", f"LEVEL: {level}", WHITE)
     hud_surface.blit(score_text, (10, 10))
     hud_surface.blit(level_text, (10, 100))
-    screen.blit(hud_surface, (BOARD_X + BOARD_WIDTH + 50, BOARD_Y + 200))
-    next_text = SMALL_FONT.render("NEXT", True, WHITE)
-    screen.blit(next_text, (BOARD_X + BOARD_WIDTH + 50, BOARD_Y + 30))
+    screen.blit(hud_surface, (SIDE_X, view.rect.y + 200))
+    next_text = text_cache.render("small", "NEXT", WHITE)
+    screen.blit(next_text, (SIDE_X, view.rect.y + 30))
+    if autoplay:
+        auto_text = text_cache.render("small", "AUTO", GREEN)
+        screen.blit(auto_text, (SIDE_X, view.rect.y + 420))
 
 def update_particles():
     for particle in particles[:]:
@@ -393,7 +604,12 @@ def update_particles():
 
 def init_game():
     global board, score, level, game_over, is_paused, current_piece, next_piece, drop_time, particles, game_over_sound_played
+    global piece_queue, board_state, autoplay_plan
     board = create_board()
+    row_fill[:] = [0] * ROWS
+    view.full_redraw = True
+    board_state = autoplayer.empty_state()
+    autoplay_plan = None
     score = 0
     level = 1
     game_over = False
@@ -402,54 +618,92 @@ def init_game():
     game_over_sound_played = False
     next_piece = get_random_piece()
     current_piece = get_random_piece()
+    piece_queue = deque(get_random_piece() for _ in range(PREVIEW_SIZE))
     drop_time = pygame.time.get_ticks()
 
-# Game loop
+def autoplay_step():
+    """One input per frame towards the autoplayer's placement, then a hard drop."""
+    global autoplay_plan
+    if autoplay_plan is None or autoplay_plan[0] is not current_piece:
+        pieces = [current_piece["id"], next_piece["id"]] + [piece["id"] for piece in piece_queue]
+        move = autoplayer.best_move(board_state, pieces)
+        if move is None:
+            hard_drop()
+            return
+        autoplay_plan = [current_piece, move[0], move[1]]
+    _, rotations, target_x = autoplay_plan
+    x = current_piece["pos"]["x"]
+    if rotations:
+        autoplay_plan[1] -= 1
+        rotate()
+    elif not (x < target_x and move_right()) and not (x > target_x and move_left()):
+        hard_drop()  # In place, or blocked on the way
+
 state = "start"
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.mixer.music.stop()  # Stop background music
-            pygame.quit()
-            sys.exit()
-        if event.type == pygame.KEYDOWN:
-            if state == "start":
-                if event.key == pygame.K_SPACE:
-                    state = "game"
-                    init_game()
-            elif state == "game":
-                if event.key == pygame.K_LEFT:
-                    move_left()
-                elif event.key == pygame.K_RIGHT:
-                    move_right()
-                elif event.key == pygame.K_DOWN:
-                    move_down()
-                elif event.key == pygame.K_UP:
-                    rotate()
-                elif event.key == pygame.K_SPACE:
-                    hard_drop()
-                elif event.key == pygame.K_p:
-                    is_paused = not is_paused
-                    if not is_paused:
-                        drop_time = pygame.time.get_ticks()
-                    if is_paused:
-                        pygame.mixer.music.pause()  # Pause background music
-                    else:
-                        pygame.mixer.music.unpause()  # Resume background music
-                elif event.key == pygame.K_r and game_over:
-                    init_game()
-                    game_over = False
 
+def handle_key(key):
+    global state, is_paused, drop_time, game_over, autoplay, autoplay_plan
+    if state == "start":
+        if key == pygame.K_SPACE:
+            state = "game"
+            init_game()
+    elif state == "game":
+        if key == pygame.K_UP:
+            rotate()
+        elif key == pygame.K_SPACE:
+            hard_drop()
+        elif key == pygame.K_p:
+            is_paused = not is_paused
+            if not is_paused:
+                drop_time = pygame.time.get_ticks()
+            if is_paused:
+                pygame.mixer.music.pause()  # Pause background music
+            else:
+                pygame.mixer.music.unpause()  # Resume background music
+        elif key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            view.zoom(1)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            view.zoom(-1)
+        elif key == pygame.K_a:
+            autoplay = not autoplay
+            autoplay_plan = None
+        elif key == pygame.K_r and game_over:
+            init_game()
+            game_over = False
+
+def handle_event(event, now):
+    """Route key events: held moves go to the auto-repeat engine, the rest to handle_key."""
+    if event.type == pygame.KEYDOWN:
+        action = REPEAT_KEYS.get(event.key)
+        if action:
+            auto_repeat.press(action, now)
+        else:
+            handle_key(event.key)
+    elif event.type == pygame.KEYUP and event.key in REPEAT_KEYS:
+        auto_repeat.release(REPEAT_KEYS[event.key], now)
+
+def update_game(now=None):
+    global drop_time, move_sound_pending
+    if state == "game":
+        auto_repeat.update(time.perf_counter() if now is None else now)
+    if state == "game" and not game_over and not is_paused:
+        if autoplay:
+            autoplay_step()
+        current_time = pygame.time.get_ticks()
+        drop_interval = 1000 - (level * 50)
+        if current_time - drop_time > drop_interval:
+            if not move_down():
+                lock_piece()
+            drop_time = current_time
+    if move_sound_pending:
+        move_sound_pending = False
+        if move_sound:
+            move_sound.play()
+
+def draw_game():
     if state == "start":
         draw_start_screen()
     elif state == "game":
-        if not game_over and not is_paused:
-            current_time = pygame.time.get_ticks()
-            drop_interval = 1000 - (level * 50)
-            if current_time - drop_time > drop_interval:
-                if not move_down():
-                    lock_piece()
-                drop_time = current_time
         draw_board()
         draw_next_piece()
         draw_hud()
@@ -457,8 +711,73 @@ while True:
         if game_over:
             draw_game_over()
         if is_paused:
-            pause_text = FONT.render("PAUSED", True, YELLOW)
+            pause_text = text_cache.render("large", "PAUSED", YELLOW)
             screen.blit(pause_text, (WINDOW_WIDTH // 2 - pause_text.get_width() // 2, WINDOW_HEIGHT // 2))
 
-    pygame.display.flip()
-    clock.tick(60)
\ No newline at end of file
+def init():
+    """Open (or reuse) the window; fonts and sounds are loaded on the first call only."""
+    global screen, assets_loaded, background
+    pygame.init()
+    pygame.mixer.init()  # Initialize audio mixer
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Tetris")
+    background = render_gradient_background()
+    view.layer = None  # Recreated for the new display
+    if assets_loaded:
+        return True
+    text_cache.load("large", 36, name="monospace", file=FONT_FILE)
+    text_cache.load("small", 20, name="monospace", file=FONT_FILE)
+    if not show_loading_screen(screen, assets, assets.preload(ASSET_MANIFEST), clock):
+        return False
+    load_audio()
+    assets_loaded = True
+    return True
+
+# Game loop
+def main():
+    global state
+    if not init():
+        return
+    state = "start"
+    auto_repeat.clear()
+    start_music()
+    last_poll = time.perf_counter()
+    while True:
+        profiler.begin_frame()
+        events = pygame.event.get()
+        now = time.perf_counter()  # Press time for the auto-repeat and latency clock
+        waited_ms = (now - last_poll) * 1000
+        last_poll = now
+        for event in events:
+            if event.type == pygame.QUIT:
+                pygame.mixer.music.stop()  # Stop background music
+                if os.environ.get("GAME_INPUT_REPORT") == "1":
+                    print(auto_repeat.latency.format("input-to-state latency"))
+                    print(queue_wait.format("event queue wait (upper bound)"))
+                if os.environ.get("GAME_AI_REPORT") == "1":
+                    print(autoplayer.table.stats())
+                return
+            if event.type == pygame.KEYDOWN:
+                queue_wait.record(waited_ms)
+            if not profiler.handle_event(event):
+                handle_event(event, now)
+        profiler.mark("input")
+        update_game()
+        profiler.mark("update")
+        draw_game()
+        profiler.draw(screen)
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        profiler.end_frame()
+        clock.tick(60)
+
+if os.environ.get("TETRIS_BOARD"):
+    configure_board(*(int(n) for n in os.environ["TETRIS_BOARD"].split("x")))
+
+if __name__ == "__main__":
+    # Optional board size argument, e.g. `python tetris.py 1000x200` (rows x columns)
+    if len(sys.argv) > 1:
+        configure_board(*(int(n) for n in sys.argv[1].split("x")))
+    main()
+    pygame.quit()
@@ -0,0 +1,378 @@
+"""Two-player versus Tetris over TCP, one player per process.
+
+Usage:
+    python versus.py host [--port 47047]
+    python versus.py join [ADDRESS] [--port 47047]
+    python versus.py loopback [--seconds 10]
+
+Each process plays its own board with the game's usual rules. Only lock
+events and garbage counts cross the wire, and each side rebuilds the
+opponent's board from them. `loopback` plays two headless autoplayer bots
+against each other on 127.0.0.1 and prints both reports.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+from collections import deque
+
+import pygame
+
+import tetris
+from autoplayer import rotate_shape, shape_cells
+
+DEFAULT_PORT = 47047
+PROTOCOL_VERSION = 1
+FPS = 60
+GARBAGE_FOR_LINES = [0, 0, 1, 2, 4]  # Lines sent to the opponent per lines cleared
+SYNC_EVERY = 10  # Locks between board hash checks
+TCP_OVERHEAD = 66  # Ethernet + IPv4 + TCP (with timestamps) header bytes per segment
+VIEW_MAX_WIDTH = 300  # Keeps the player's board clear of the opponent panel
+OPPONENT_X, OPPONENT_Y = 10, 80
+OPPONENT_WIDTH, OPPONENT_HEIGHT = 220, 480
+
+# Messages are a one-byte kind followed by fixed-size big-endian fields
+HELLO = b"H"
+LOCK = b"L"
+ATTACK = b"A"
+RISE = b"R"
+SYNC = b"S"
+TOPOUT = b"T"
+MESSAGES = {
+    HELLO: struct.Struct("!BHH"),  # Protocol version, rows, columns
+    LOCK: struct.Struct("!Bhh"),  # Piece id << 2 | rotation, x, y
+    ATTACK: struct.Struct("!B"),  # Garbage lines for the receiver
+    RISE: struct.Struct("!BH"),  # Garbage lines that entered the sender's board, hole column
+    SYNC: struct.Struct("!Q"),  # Zobrist hash of the sender's board
+    TOPOUT: struct.Struct("!"),
+}
+
+
+# One TCP connection. Messages sent during a frame are collected and written
+# together by flush(), so a frame costs at most one segment; a reader task
+# decodes incoming messages into `inbox` for the game loop to drain.
+class VersusLink:
+    def __init__(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Don't hold small writes back
+        self.reader = reader
+        self.writer = writer
+        self.outbox = bytearray()
+        self.inbox = deque()  # (kind, fields)
+        self.closed = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.writes = 0
+        self.task = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def host(cls, address, port):
+        """Wait for one opponent to connect."""
+        connected = asyncio.get_running_loop().create_future()
+
+        def accept(reader, writer):
+            if connected.done():
+                writer.close()
+            else:
+                connected.set_result((reader, writer))
+
+        server = await asyncio.start_server(accept, address, port)
+        print(f"Waiting for an opponent on {address}:{port}")
+        try:
+            reader, writer = await connected
+        finally:
+            server.close()
+        return cls(reader, writer)
+
+    @classmethod
+    async def join(cls, address, port, timeout=10):
+        """Connect to a host, retrying until it is listening."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(address, port)
+                return cls(reader, writer)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+    def send(self, kind, *fields):
+        self.outbox += kind + MESSAGES[kind].pack(*fields)
+
+    async def flush(self):
+        if not self.outbox or self.closed:
+            return
+        self.writer.write(bytes(self.outbox))
+        self.bytes_sent += len(self.outbox)
+        self.writes += 1
+        self.outbox.clear()
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+
+    async def _receive(self):
+        try:
+            while True:
+                kind = await self.reader.readexactly(1)
+                layout = MESSAGES.get(kind)
+                if layout is None:
+                    print(f"Unknown message {kind!r}, closing the connection")
+                    break
+                self.inbox.append((kind, layout.unpack(await self.reader.readexactly(layout.size))))
+                self.bytes_received += 1 + layout.size
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.closed = True
+
+    def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+# Versus rules on top of the single-player game. Garbage waits in `incoming`
+# until the next lock: a lock that clears lines cancels it first, a lock that
+# clears nothing lets it all rise. The opponent's board is a BoardState
+# rebuilt from its LOCK and RISE messages, checked against its SYNC hashes.
+class Versus:
+    def __init__(self, link, seed=None):
+        self.link = link
+        self.rng = random.Random(seed)
+        self.shadow = tetris.autoplayer.empty_state()
+        self.shadow_surface = None  # Redrawn only when the shadow changes
+        self.incoming = deque()  # Garbage line counts, one hole column per attack
+        self.cells = {}  # (piece id, rotation) -> cells
+        for piece_id, shape in enumerate(tetris.SHAPES):
+            for rotation in range(4 if shape else 0):
+                self.cells[piece_id, rotation] = shape_cells(shape)
+                shape = rotate_shape(shape)
+        self.result = None  # "win", "lose", "disconnected" or "mismatch"
+        self.locks = 0
+        self.garbage_sent = 0
+        self.garbage_received = 0
+        self.syncs = 0
+        self.desyncs = 0
+        self.elapsed = 0.0
+        link.send(HELLO, PROTOCOL_VERSION, tetris.ROWS, tetris.COLS)
+
+    def on_lock(self, piece, lines):
+        x, y = piece["pos"]["x"], piece["pos"]["y"]
+        self.link.send(LOCK, piece["id"] << 2 | piece["rotation"], x, y)
+        if lines:
+            attack = GARBAGE_FOR_LINES[min(lines, 4)]
+            while attack and self.incoming:
+                cancelled = min(attack, self.incoming[0])
+                attack -= cancelled
+                self.incoming[0] -= cancelled
+                if not self.incoming[0]:
+                    self.incoming.popleft()
+            if attack:
+                self.link.send(ATTACK, attack)
+                self.garbage_sent += attack
+        while self.incoming and not lines:
+            count = self.incoming.popleft()
+            hole = self.rng.randrange(tetris.COLS)
+            tetris.add_garbage(count, hole)
+            self.link.send(RISE, count, hole)
+        self.locks += 1
+        if self.locks % SYNC_EVERY == 0:
+            self.link.send(SYNC, tetris.board_state.hash)
+
+    def top_out(self):
+        self.link.send(SYNC, tetris.board_state.hash)
+        self.link.send(TOPOUT)
+        self.result = "lose"
+
+    def receive(self):
+        """Apply the opponent's messages that arrived since the last frame."""
+        while self.link.inbox:
+            kind, fields = self.link.inbox.popleft()
+            if kind == LOCK:
+                packed, x, y = fields
+                cells = [(y + cy, x + cx) for cy, cx in self.cells[packed >> 2, packed & 3]]
+                self.shadow, _ = self.shadow.place(cells)
+                self.shadow_surface = None
+            elif kind == RISE:
+                self.shadow, _ = self.shadow.rise(*fields)
+                self.shadow_surface = None
+            elif kind == ATTACK:
+                self.incoming.append(fields[0])
+                self.garbage_received += fields[0]
+            elif kind == SYNC:
+                self.syncs += 1
+                if fields[0] != self.shadow.hash:
+                    self.desyncs += 1
+                    print(f"Opponent board out of sync after {self.syncs} checks")
+            elif kind == TOPOUT and self.result is None:
+                self.result = "win"
+            elif kind == HELLO and fields != (PROTOCOL_VERSION, tetris.ROWS, tetris.COLS):
+                print(f"Opponent plays protocol {fields[0]} on a {fields[1]}x{fields[2]} board, "
+                      f"expected {PROTOCOL_VERSION} on {tetris.ROWS}x{tetris.COLS}")
+                self.result = "mismatch"
+        if self.link.closed and self.result is None:
+            self.result = "disconnected"
+
+    def draw_opponent(self, surface):
+        rows, cols = tetris.ROWS, tetris.COLS
+        cell = max(1, min(OPPONENT_WIDTH // cols, OPPONENT_HEIGHT // rows))
+        shown = min(rows, OPPONENT_HEIGHT // cell)  # Bottom rows only on very tall boards
+        if self.shadow_surface is None:
+            self.shadow_surface = pygame.Surface((cols * cell, shown * cell))
+            self.shadow_surface.fill(tetris.BLACK)
+            for i, mask in enumerate(self.shadow.masks[rows - shown:]):
+                while mask:
+                    low = mask & -mask
+                    self.shadow_surface.fill(tetris.GRAY, ((low.bit_length() - 1) * cell, i * cell, cell, cell))
+                    mask ^= low
+        rect = surface.blit(self.shadow_surface, (OPPONENT_X, OPPONENT_Y))
+        pygame.draw.rect(surface, tetris.GRAY, rect.inflate(4, 4), 2)
+        label = tetris.text_cache.render("small", "OPPONENT", tetris.WHITE)
+        surface.blit(label, (OPPONENT_X, OPPONENT_Y - 35))
+
+    def draw(self, surface):
+        tetris.draw_board()
+        tetris.draw_next_piece()
+        tetris.draw_hud()
+        tetris.update_particles()
+        self.draw_opponent(surface)
+        # Pending garbage as a bar beside the board
+        pending = min(sum(self.incoming) * tetris.view.cell, tetris.view.rect.height)
+        if pending:
+            bar = pygame.Rect(tetris.view.rect.x - 10, tetris.view.rect.bottom - pending, 6, pending)
+            surface.fill(tetris.RED, bar)
+        if self.result:
+            message = {"win": "YOU WIN", "lose": "YOU LOSE"}.get(self.result, self.result.upper())
+            text = tetris.text_cache.render("large", message, tetris.YELLOW)
+            surface.blit(text, (tetris.WINDOW_WIDTH // 2 - text.get_width() // 2, tetris.WINDOW_HEIGHT // 2 - 40))
+            hint = tetris.text_cache.render("small", "Esc to quit", tetris.WHITE)
+            surface.blit(hint, (tetris.WINDOW_WIDTH // 2 - hint.get_width() // 2, tetris.WINDOW_HEIGHT // 2 + 20))
+
+    def report(self, seconds):
+        link = self.link
+        wire = link.bytes_sent + link.writes * TCP_OVERHEAD
+        return (f"{self.result or 'time up'} after {seconds:.1f} s: {self.locks} locks, "
+                f"{self.garbage_sent} garbage lines sent, {self.garbage_received} received\n"
+                f"  sent {link.bytes_sent} B in {link.writes} writes: {link.bytes_sent / seconds:.0f} B/s payload, "
+                f"~{wire / seconds / 1000:.2f} KB/s with TCP/IP headers; received {link.bytes_received} B\n"
+                f"  {self.syncs} board checks, {self.desyncs} out of sync")
+
+
+async def play(link, bot=False, seconds=None):
+    """Run one match on this process's board; returns the Versus with its results."""
+    if not tetris.init():
+        return None
+    tetris.VIEW_MAX_WIDTH = VIEW_MAX_WIDTH
+    tetris.view.fit()
+    match = Versus(link)
+    tetris.on_lock = match.on_lock
+    tetris.autoplay = bot
+    tetris.state = "game"
+    tetris.init_game()
+    tetris.auto_repeat.clear()
+    if not bot:
+        tetris.start_music()
+    profiler = tetris.profiler
+    screen = tetris.screen
+    start = next_frame = time.perf_counter()
+    running = True
+    while running:
+        profiler.begin_frame()
+        now = time.perf_counter()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif profiler.handle_event(event):
+                pass
+            elif match.result is None and not (event.type == pygame.KEYDOWN and event.key in (pygame.K_p, pygame.K_r)):
+                tetris.handle_event(event, now)  # No pausing or restarting mid-match
+        profiler.mark("input")
+        match.receive()
+        if match.result is None:
+            tetris.update_game(now)
+            if tetris.game_over:
+                match.top_out()
+        profiler.mark("update")
+        match.draw(screen)
+        profiler.draw(screen)
+        profiler.mark("draw")
+        pygame.display.flip()
+        profiler.mark("flip")
+        await link.flush()
+        profiler.mark("net")
+        profiler.end_frame()
+        if seconds and now - start >= seconds or bot and match.result:
+            break
+        # Sleep on the event loop rather than in clock.tick so the socket keeps being serviced
+        next_frame = max(next_frame + 1 / FPS, time.perf_counter() - 1 / FPS)
+        await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+    tetris.on_lock = None
+    pygame.mixer.music.stop()
+    match.elapsed = time.perf_counter() - start
+    return match
+
+
+async def run(args):
+    if args.mode == "host":
+        link = await VersusLink.host(args.address, args.port)
+    else:
+        link = await VersusLink.join(args.address, args.port)
+    try:
+        match = await play(link, args.bot, args.seconds)
+    finally:
+        link.close()
+    if match is None:
+        return 0
+    print(match.report(match.elapsed))
+    return 1 if match.desyncs else 0
+
+
+def loopback(seconds):
+    """Two headless bots on 127.0.0.1; fails if either one saw its opponent's board diverge."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    common = ["--bot", "--headless", "--seconds", str(seconds), "--port", str(port)]
+    players = [
+        (role, subprocess.Popen([sys.executable, os.path.abspath(__file__), role] + common,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env))
+        for role in ("host", "join")
+    ]
+    failed = False
+    for role, process in players:
+        output, _ = process.communicate()
+        print(f"{role}: {output.strip()}")
+        failed = failed or process.returncode != 0
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["host", "join", "loopback"])
+    parser.add_argument("address", nargs="?", default="127.0.0.1", help="address to listen on or connect to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bot", action="store_true", help="let the autoplayer play this board")
+    parser.add_argument("--headless", action="store_true", help="no window or sound")
+    parser.add_argument("--seconds", type=float, help="end the match after this long")
+    args = parser.parse_args(argv)
+    if args.mode == "loopback":
+        return loopback(args.seconds or 10)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    try:
+        return asyncio.run(run(args))
+    finally:
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import numpy as np
+
+# Car physics for the racer, advanced in fixed steps of `dt` seconds no matter
+# how long a frame takes. Positions are car centres in pixels, velocities are
+# in px/s. Every step keeps the positions it started from, so the renderer
+# can interpolate between steps and collisions can be swept across the step.
+
+
+def approach(value, target, rate):
+    """`value` moved towards `target` by at most `rate`."""
+    if value < target:
+        return min(value + rate, target)
+    return max(value - rate, target)
+
+
+class PlayerCar:
+    def __init__(self, width, height, max_speed, accel, steer_speed, steer_accel):
+        self.width = width
+        self.height = height
+        self.max_speed = max_speed
+        self.accel = accel
+        self.steer_speed = steer_speed  # Top sideways speed at full lock
+        self.steer_accel = steer_accel
+        self.reset(0.0, 0.0)
+
+    def reset(self, x, y):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.vx = 0.0
+        self.vy = 0.0
+
+    def step(self, dt, throttle, steer, top, bottom):
+        """`throttle` and `steer` are -1, 0 or 1 (up the screen is forward); stays between `top` and `bottom`."""
+        self.prev_x, self.prev_y = self.x, self.y
+        # Without input the car coasts back to rest at the same rate it accelerates
+        self.vy = approach(self.vy, -throttle * self.max_speed, self.accel * dt)
+        self.vx = approach(self.vx, steer * self.steer_speed, self.steer_accel * dt)
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        half = self.height / 2
+        if self.y - half < top:
+            self.y, self.vy = top + half, 0.0
+        elif self.y + half > bottom:
+            self.y, self.vy = bottom - half, 0.0
+
+    def rewind(self, fraction):
+        """Go back to `fraction` of the way through the last step and stay there."""
+        self.x = self.prev_x = self.prev_x + (self.x - self.prev_x) * fraction
+        self.y = self.prev_y = self.prev_y + (self.y - self.prev_y) * fraction
+
+
+# Every traffic car lives in numpy arrays, so a step is the same dozen array
+# operations for 5 cars or 500. Cars keep to their lane on a loop `span`
+# pixels long: one that leaves the bottom of the screen comes back in above
+# it, behind the rest of its lane. Each car drives at its own cruising speed
+# but never closes on the car ahead to less than `min_gap`, so cars never
+# pass each other and the car ahead of each one is worked out once in reset().
+class Traffic:
+    def __init__(self, count, lanes, width, height, span, speeds, accel, min_gap, rng):
+        self.count = count
+        self.lanes = np.asarray(lanes, dtype=float)  # Lane centre x
+        self.width = width
+        self.height = height
+        self.span = span
+        self.speeds = speeds  # (min, max) cruising speed in px/s
+        self.accel = accel
+        self.min_gap = min_gap
+        self.rng = rng
+        self.reset()
+
+    def reset(self, top=0.0):
+        count = self.count
+        self.lane = np.arange(count) % len(self.lanes)
+        self.rng.shuffle(self.lane)
+        self.x = self.lanes[self.lane]
+        # Spread each lane's cars evenly along the loop, above `top`, with some jitter
+        slot = np.empty(count)
+        per_lane = np.bincount(self.lane, minlength=len(self.lanes))
+        for lane, cars in enumerate(per_lane):
+            members = self.lane == lane
+            spacing = self.span / max(cars, 1)
+            jitter = self.rng.uniform(0, max(0.0, spacing - self.height - self.min_gap), cars)
+            slot[members] = np.arange(cars) * spacing + jitter
+        self.y = top - self.height - slot
+        self.prev_y = self.y.copy()
+        # Within a lane the car ahead has the next larger y; the front car's
+        # leader is the lane's last car, one loop further on
+        order = np.lexsort((self.y, self.lane))
+        lane = self.lane[order]
+        last = np.append(lane[1:] != lane[:-1], True)
+        ahead = np.roll(order, -1)
+        ahead[last] = order[np.searchsorted(lane, lane[last], "left")]
+        self.leader = np.empty(count, dtype=int)
+        self.leader[order] = ahead
+        self.alone = self.leader == np.arange(count)
+        self.cruise = self.rng.uniform(*self.speeds, count)
+        self.vy = self.cruise.copy()
+
+    def step(self, dt, bottom):
+        self.prev_y[:] = self.y
+        # Distance along the loop, so the front car sees the wrapped last car ahead
+        gap = np.where(self.alone, self.span, np.mod(self.y[self.leader] - self.y, self.span)) - self.height
+        # Match the leader's speed at min_gap, go slower when closer
+        limit = np.maximum(self.vy[self.leader] + (gap - self.min_gap) * 4.0, 0.0)
+        self.vy = np.minimum(np.minimum(self.vy + self.accel * dt, self.cruise), limit)
+        self.y += self.vy * dt
+        # Back to the top of the loop once past the bottom of the screen
+        passed = self.y - self.height / 2 > bottom
+        if passed.any():
+            self.y[passed] -= self.span
+            self.prev_y[passed] = self.y[passed]  # Don't interpolate across the jump
+
+    def rewind(self, fraction):
+        self.y = self.prev_y + (self.y - self.prev_y) * fraction
+        self.prev_y = self.y.copy()
+
+    def visible(self, top, bottom):
+        """Indices of the cars that overlap the rows `top` to `bottom`."""
+        half = self.height / 2
+        return np.nonzero((self.y + half > top) & (self.y - half < bottom))[0]
+
+
+def sweep(car, traffic):
+    """Fraction of the last step (0-1) at which the player first touched a traffic car, or None.
+
+    Both moved during the step, so the player is swept against each car with
+    their relative motion; the boxes are grown by the player's half size so
+    the player can be treated as a point (a ray cast against the slabs).
+    """
+    half_w = (car.width + traffic.width) / 2
+    half_h = (car.height + traffic.height) / 2
+    # Start offset and motion of the player relative to each car
+    start_x = car.prev_x - traffic.x
+    start_y = car.prev_y - traffic.prev_y
+    move_x = car.x - car.prev_x  # Traffic doesn't change lanes
+    move_y = (car.y - car.prev_y) - (traffic.y - traffic.prev_y)
+    entry_x, exit_x = _slab(start_x, move_x, half_w)
+    entry_y, exit_y = _slab(start_y, move_y, half_h)
+    entry = np.maximum(entry_x, entry_y)
+    exit_ = np.minimum(exit_x, exit_y)
+    hit = (entry < exit_) & (entry <= 1.0) & (exit_ > 0.0)
+    if not hit.any():
+        return None
+    return max(0.0, float(entry[hit].min()))
+
+
+def _slab(start, move, half):
+    """Entry and exit times of points moving from `start` by `move` through the slab -half..half."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (-half - start) / move
+        t2 = (half - start) / move
+    entry = np.minimum(t1, t2)
+    exit_ = np.maximum(t1, t2)
+    # Not moving on this axis: inside the slab for the whole step, or never
+    still = move == 0
+    inside = np.abs(start) < half
+    entry = np.where(still, np.where(inside, -np.inf, np.inf), entry)
+    exit_ = np.where(still, np.where(inside, np.inf, -np.inf), exit_)
+    return entry, exit_
@@ -1,17 +1,21 @@
 import pygame
-import random
 import asyncio
 import platform
+import os
+import sys
+import time
 import numpy as np
 
-# Initialize Pygame
-pygame.init()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.text_cache import TextCache
+from shared.input_buffer import InputBuffer
+from shared.profiler import FrameProfiler
+from physics import PlayerCar, Traffic, sweep
 
 # Screen settings
 WIDTH = 800
 HEIGHT = 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Top-Down Racer")
+screen = None  # Opened by init(), importing the module opens nothing
 
 # Colors
 GRAY = (100, 100, 100)
@@ -22,22 +26,49 @@ BLACK = (0, 0, 0)
 
 # Game settings
 FPS = 60
-PLAYER_SPEED = 5
-ENEMY_SPEED = 3
 ROAD_WIDTH = 400
 ROAD_X = (WIDTH - ROAD_WIDTH) // 2
+ROAD_SCROLL_SPEED = 0  # Track is static for now; > 0 scrolls the cached road layer
+
+# Physics runs at a fixed rate, independent of the frame rate; speeds are px/s
+PHYSICS_HZ = 240
+STEP = 1 / PHYSICS_HZ
+MAX_FRAME_TIME = 0.25  # Longer stalls are dropped rather than caught up
+PLAYER_MAX_SPEED = 300  # Was 5 px a frame
+PLAYER_ACCEL = 1200
+STEER_SPEED = 300
+STEER_ACCEL = 2400
+LANES = 5
+LANE_WIDTH = ROAD_WIDTH // LANES
+TRAFFIC_COUNT = int(os.environ.get("RACER_TRAFFIC", 8))
+TRAFFIC_SPEEDS = (120, 240)  # Cruising speed range, was 3 px a frame
+TRAFFIC_ACCEL = 200
+TRAFFIC_GAP = 40  # Closest a car follows the one ahead in its lane
 
 # Player car
 player_size = (40, 60)
 player = pygame.Surface(player_size)
 player.fill(RED)
 player_rect = player.get_rect(center=(WIDTH // 2, HEIGHT - 100))
+player_car = PlayerCar(*player_size, PLAYER_MAX_SPEED, PLAYER_ACCEL, STEER_SPEED, STEER_ACCEL)
 
-# Enemy car
+# Traffic cars
 enemy_size = (40, 60)
 enemy = pygame.Surface(enemy_size)
 enemy.fill(GREEN)
-enemy_rect = enemy.get_rect(center=(random.randint(ROAD_X + 20, ROAD_X + ROAD_WIDTH - 20), -enemy_size[1]))
+traffic = Traffic(
+    TRAFFIC_COUNT,
+    lanes=[ROAD_X + LANE_WIDTH * (i + 0.5) for i in range(LANES)],
+    width=enemy_size[0],
+    height=enemy_size[1],
+    # Loop length per lane: room for every car at twice its spacing, and always
+    # long enough that a car leaving the bottom comes back in above the screen
+    span=max(HEIGHT + 2 * enemy_size[1], -(-TRAFFIC_COUNT // LANES) * (enemy_size[1] + TRAFFIC_GAP) * 2),
+    speeds=TRAFFIC_SPEEDS,
+    accel=TRAFFIC_ACCEL,
+    min_gap=TRAFFIC_GAP,
+    rng=np.random.default_rng(),
+)
 
 # Sound (simple beep for collision)
 def create_collision_sound():
@@ -49,83 +80,171 @@ def create_collision_sound():
     sound_array = np.column_stack((sound_data, sound_data)).astype(np.int16)
     return pygame.sndarray.make_sound(sound_array)
 
-collision_sound = create_collision_sound()
+collision_sound = None
+
+# Static road layer (background, road and kerbs), rendered once.
+# The layer is uniform vertically so it can be tiled when the track scrolls.
+def create_road_layer():
+    layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+    layer.fill(BLACK)
+    pygame.draw.rect(layer, GRAY, (ROAD_X, 0, ROAD_WIDTH, HEIGHT))
+    pygame.draw.rect(layer, WHITE, (ROAD_X - 10, 0, 10, HEIGHT))
+    pygame.draw.rect(layer, WHITE, (ROAD_X + ROAD_WIDTH, 0, 10, HEIGHT))
+    return layer
+
+road_layer = None
 
 # Game variables
 score = 0
 game_over = False
-font = pygame.font.SysFont(None, 48)
 clock = pygame.time.Clock()
+inputs = InputBuffer()
+profiler = FrameProfiler("top_down_racer")  # F3 overlay, F9 cProfile capture
+# Score text is only re-rendered when the displayed integer changes
+text_cache = TextCache()
+road_offset = 0
+dirty_rects = []  # Screen areas drawn over last frame, restored from road_layer
+full_redraw = True
+accumulator = 0.0  # Frame time not yet simulated, less than one STEP after update_game()
+last_update = None
 
 def setup():
-    global score, game_over, player_rect, enemy_rect
+    global score, game_over, road_offset, full_redraw, accumulator, last_update
     score = 0
     game_over = False
-    player_rect.center = (WIDTH // 2, HEIGHT - 100)
-    enemy_rect.center = (random.randint(ROAD_X + 20, ROAD_X + ROAD_WIDTH - 20), -enemy_size[1])
-
-def update_loop():
-    global score, game_over, enemy_rect
-
-    if not game_over:
-        # Player movement
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and player_rect.left > ROAD_X:
-            player_rect.x -= PLAYER_SPEED
-        if keys[pygame.K_RIGHT] and player_rect.right < ROAD_X + ROAD_WIDTH:
-            player_rect.x += PLAYER_SPEED
-        if keys[pygame.K_UP] and player_rect.top > 0:
-            player_rect.y -= PLAYER_SPEED
-        if keys[pygame.K_DOWN] and player_rect.bottom < HEIGHT:
-            player_rect.y += PLAYER_SPEED
-
-        # Enemy movement
-        enemy_rect.y += ENEMY_SPEED
-        if enemy_rect.top > HEIGHT:
-            enemy_rect.center = (random.randint(ROAD_X + 20, ROAD_X + ROAD_WIDTH - 20), -enemy_size[1])
-
-        # Collision detection
-        if player_rect.colliderect(enemy_rect) or player_rect.left <= ROAD_X or player_rect.right >= ROAD_X + ROAD_WIDTH:
-            collision_sound.play()
-            game_over = True
-
-        # Update score
-        score += 1 / FPS
-
-    # Draw
-    screen.fill(BLACK)
-    # Draw road
-    pygame.draw.rect(screen, GRAY, (ROAD_X, 0, ROAD_WIDTH, HEIGHT))
-    pygame.draw.rect(screen, WHITE, (ROAD_X - 10, 0, 10, HEIGHT))
-    pygame.draw.rect(screen, WHITE, (ROAD_X + ROAD_WIDTH, 0, 10, HEIGHT))
-    # Draw cars
-    screen.blit(player, player_rect)
-    screen.blit(enemy, enemy_rect)
-    # Draw score
-    score_text = font.render(f"Score: {int(score)}", True, WHITE)
-    screen.blit(score_text, (10, 10))
-    # Draw game over
+    road_offset = 0
+    full_redraw = True  # Clears the game over text
+    accumulator = 0.0
+    last_update = None
+    player_car.reset(WIDTH // 2, HEIGHT - 100)
+    traffic.reset()
+
+def physics_step(throttle, steer):
+    """Advance the cars by one STEP; returns True on a crash."""
+    player_car.step(STEP, throttle, steer, 0, HEIGHT)
+    traffic.step(STEP, HEIGHT)
+    # Marked per step; the profiler adds them up into the frame's phases
+    profiler.mark("update")
+    crashed = collide()
+    profiler.mark("collide")
+    return crashed
+
+def collide():
+    """Check the step just taken for a crash, stopping the cars where it happened."""
+    hit = sweep(player_car, traffic)
+    if hit is not None:
+        # Stop everything at the moment of contact, not wherever the step ended
+        player_car.rewind(hit)
+        traffic.rewind(hit)
+        return True
+    half = player_car.width / 2
+    return player_car.x - half <= ROAD_X or player_car.x + half >= ROAD_X + ROAD_WIDTH
+
+def update_game(dt=None):
+    """Run the physics steps that fit in the time since the last call (or `dt` seconds)."""
+    global score, game_over, road_offset, accumulator, last_update
+
+    now = time.perf_counter()
+    if dt is None:
+        dt = now - last_update if last_update is not None else 1 / FPS
+    last_update = now
+
+    if game_over and inputs.consume(pygame.K_SPACE):
+        setup()  # Restart game
+    elif not game_over:
+        # Held keys come from the input buffer and apply to every step this frame
+        throttle = inputs.is_held(pygame.K_UP) - inputs.is_held(pygame.K_DOWN)
+        steer = inputs.is_held(pygame.K_RIGHT) - inputs.is_held(pygame.K_LEFT)
+        accumulator += min(dt, MAX_FRAME_TIME)
+        while accumulator >= STEP:
+            accumulator -= STEP
+            score += STEP
+            if physics_step(throttle, steer):
+                collision_sound.play()
+                game_over = True
+                accumulator = 0.0  # Freeze where the crash happened
+                break
+
+        road_offset = (road_offset + ROAD_SCROLL_SPEED) % HEIGHT
+
+def draw_road():
+    # At most two blits: the layer is tiled vertically at road_offset
+    screen.blit(road_layer, (0, road_offset))
+    if road_offset:
+        screen.blit(road_layer, (0, road_offset - HEIGHT))
+
+def draw():
+    global dirty_rects, full_redraw
+    redraw_all = full_redraw or ROAD_SCROLL_SPEED
+    if redraw_all:
+        draw_road()
+    else:
+        # Only restore the areas covered by last frame's cars and text
+        for rect in dirty_rects:
+            screen.blit(road_layer, rect, rect)
+
+    # Draw between the last two physics states, `alpha` of the way to the latest
+    alpha = accumulator / STEP
+    player_rect.center = (
+        round(player_car.prev_x + (player_car.x - player_car.prev_x) * alpha),
+        round(player_car.prev_y + (player_car.y - player_car.prev_y) * alpha),
+    )
+    visible = traffic.visible(0, HEIGHT)
+    xs = traffic.x[visible] - enemy_size[0] / 2
+    ys = traffic.prev_y[visible] + (traffic.y[visible] - traffic.prev_y[visible]) * alpha - enemy_size[1] / 2
+    drawn = screen.blits([(enemy, (round(x), round(y))) for x, y in zip(xs.tolist(), ys.tolist())])
+    drawn += [
+        screen.blit(player, player_rect),
+        screen.blit(text_cache.render("hud", f"Score: {int(score)}", WHITE), (10, 10)),
+    ]
     if game_over:
-        game_over_text = font.render(f"Game Over! Score: {int(score)}", True, WHITE)
-        text_rect = game_over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        screen.blit(game_over_text, text_rect)
-
-    pygame.display.flip()
+        text = text_cache.render("hud", f"Game Over! Score: {int(score)}", WHITE)
+        drawn.append(screen.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2))))
+    overlay = profiler.draw(screen)
+    if overlay:
+        drawn.append(overlay)
+    profiler.mark("draw")
+
+    if redraw_all:
+        pygame.display.flip()
+    else:
+        pygame.display.update(dirty_rects + drawn)
+    profiler.mark("flip")
+    dirty_rects = drawn
+    full_redraw = False
+
+def init():
+    """Open (or reuse) the window; the sound, road layer and font are built on the first call only."""
+    global screen, collision_sound, road_layer
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Top-Down Racer")
+    if road_layer is None:
+        collision_sound = create_collision_sound()
+        road_layer = create_road_layer()
+        text_cache.load("hud", 48)
 
 async def main():
+    init()
     setup()
+    inputs.clear()
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            if event.type == pygame.KEYDOWN and game_over and event.key == pygame.K_SPACE:
-                setup()  # Restart game
-        update_loop()
+        profiler.begin_frame()
+        inputs.poll()
+        if inputs.quit:
+            return
+        for event in inputs.frame_events:
+            profiler.handle_event(event)
+        profiler.mark("input")
+        update_game()
+        profiler.mark("update")
+        draw()
+        profiler.end_frame()
         await asyncio.sleep(1.0 / FPS)
 
 if platform.system() == "Emscripten":
     asyncio.ensure_future(main())
 else:
     if __name__ == "__main__":
-        asyncio.run(main())
\ No newline at end of file
+        asyncio.run(main())
+        pygame.quit()
\ No newline at end of file